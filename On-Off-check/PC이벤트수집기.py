@@ -0,0 +1,137 @@
+# PC 시작/종료 이벤트를 주기적으로 수집해 구글 시트(PC_Events)에 올리는 수집기
+# 작업 스케줄러에 --once로 등록하거나 백그라운드 프로세스로 계속 실행한다.
+# 새 이벤트는 먼저 로컬 스풀 파일에 모아 두었다가 flush 주기마다 한 번에 올린다.
+import argparse
+import json
+import os
+import platform
+import time
+from datetime import datetime
+
+from 출퇴근엔진 import (
+    DATA_DIR,
+    EVENT_TIME_FORMAT,
+    WATERMARK_FILE,
+    FileEventSource,
+    append_events_to_sheet,
+    get_event_source,
+    sync_pc_events,
+)
+
+SPOOL_FILE = os.path.join(DATA_DIR, 'pc_events_spool.jsonl')
+
+def log(message):
+    print(f"[{datetime.now().strftime(EVENT_TIME_FORMAT)}] {message}", flush=True)
+
+def read_spool(spool_file):
+    """스풀 파일의 이벤트 목록 읽기"""
+    events = []
+    if not os.path.exists(spool_file):
+        return events
+    with open(spool_file, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                events.append(json.loads(line))
+    return events
+
+def append_to_spool(events, spool_file):
+    """이벤트를 스풀 파일 끝에 추가"""
+    with open(spool_file, 'a', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps({
+                'time': event['time'].strftime(EVENT_TIME_FORMAT),
+                'type': event['type'],
+                'event_id': event['event_id'],
+                'computer': event['computer']
+            }, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+def collect_once(source, computer_name, spool_file=SPOOL_FILE, watermark_file=WATERMARK_FILE, since=None):
+    """마지막 수집 이후의 새 이벤트를 스풀 파일에 추가, 추가한 개수 반환"""
+    # 스풀에 기록한 뒤에 수집 위치를 옮기며, 처음 수집할 때는 아직 올리지 않은 스풀 이벤트도 중복 확인에 포함
+    pending = read_spool(spool_file) + read_spool(f"{spool_file}.flushing")
+    new_events = sync_pc_events(
+        source, computer_name,
+        sink=lambda events: append_to_spool(events, spool_file),
+        watermark_file=watermark_file, since=since, pending=pending
+    )
+    return len(new_events)
+
+def flush_spool(spool_file=SPOOL_FILE, sink=append_events_to_sheet,
+                max_retries=5, base_delay=1.0, max_delay=60.0, sleep=time.sleep):
+    """스풀 파일의 이벤트를 sink로 보내기, 보낸 개수 반환
+
+    보내는 동안에는 스풀을 '.flushing' 파일로 옮겨 두고, 실패하면 지수 백오프로 재시도한다.
+    끝내 실패하면 예외를 그대로 올리고 '.flushing' 파일은 다음 flush에서 다시 보낸다.
+    """
+    flushing_file = f"{spool_file}.flushing"
+    if not os.path.exists(flushing_file):
+        if not os.path.exists(spool_file) or os.path.getsize(spool_file) == 0:
+            return 0
+        os.replace(spool_file, flushing_file)
+
+    events = read_spool(flushing_file)
+    for attempt in range(max_retries + 1):
+        try:
+            if events:
+                sink(events)
+            os.remove(flushing_file)
+            return len(events)
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            log(f"업로드 실패 ({attempt + 1}/{max_retries}), {delay:.0f}초 후 재시도: {str(e)}")
+            sleep(delay)
+
+def main():
+    parser = argparse.ArgumentParser(description="PC 시작/종료 이벤트 수집기")
+    parser.add_argument('--interval', type=float, default=60, help="수집 주기 (초)")
+    parser.add_argument('--flush-interval', type=float, default=300, help="업로드 주기 (초)")
+    parser.add_argument('--once', action='store_true', help="한 번 수집/업로드하고 종료 (작업 스케줄러용)")
+    parser.add_argument('--since', help="처음 수집할 때 이 날짜(YYYY-MM-DD) 이전 기록은 건너뜀")
+    parser.add_argument('--computer', default=platform.node(), help="PC 이름 (기본: 현재 PC)")
+    parser.add_argument('--spool', default=SPOOL_FILE, help="스풀 파일 경로")
+    parser.add_argument('--watermark', default=WATERMARK_FILE, help="PC별 수집 위치 파일 경로")
+    parser.add_argument('--max-retries', type=int, default=5, help="업로드 재시도 횟수")
+    parser.add_argument('--record', help="이벤트 로그를 이 파일(JSON Lines)로 저장하고 종료 (PC_EVENT_SOURCE_FILE용 기록 파일)")
+    parser.add_argument('--record-limit', type=int, help="--record로 저장할 최대 기록 수 (최신 기록부터)")
+    args = parser.parse_args()
+
+    source = get_event_source()
+    if source is None:
+        log("이벤트 원본이 없습니다. Windows에서 실행하거나 PC_EVENT_SOURCE_FILE을 지정하세요.")
+        return 1
+
+    if args.record:
+        count = FileEventSource.record(source, args.record, args.record_limit)
+        log(f"이벤트 기록 {count}건을 {args.record}에 저장")
+        return 0
+
+    since = datetime.strptime(args.since, '%Y-%m-%d') if args.since else None
+    last_flush = 0.0
+    while True:
+        try:
+            collected = collect_once(source, args.computer, args.spool, args.watermark, since=since)
+            if collected:
+                log(f"새 이벤트 {collected}건 수집")
+        except Exception as e:
+            log(f"이벤트 수집 오류: {str(e)}")
+
+        if args.once or time.time() - last_flush >= args.flush_interval:
+            try:
+                flushed = flush_spool(args.spool, max_retries=args.max_retries)
+                if flushed:
+                    log(f"이벤트 {flushed}건 업로드")
+            except Exception as e:
+                log(f"업로드 오류, 다음 주기에 다시 시도합니다: {str(e)}")
+            last_flush = time.time()
+
+        if args.once:
+            return 0
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+# Google Sheets API 일부를 JSON 파일로 흉내내는 개발/테스트용 대체 시트
+# SHEETS_LOCAL_FILE 환경 변수에 JSON 파일 경로를 지정하면 출퇴근엔진.get_sheets_client()가
+# 실제 Google Sheets 대신 이 모듈을 쓴다 (Linux CI, 수집기 시험, 벤치마크.py 등).
+import json
+import os
+import threading
+
+class LocalSheetsService:
+    """Google Sheets API 일부를 JSON 파일로 흉내내는 로컬 대체 서비스 (테스트/CI용)
+
+    spreadsheets().get / batchUpdate(insertDimension, updateCells)와
+    spreadsheets().values().get / append / update 만 지원한다.
+    """
+
+    class _Request:
+        def __init__(self, func):
+            self._func = func
+
+        def execute(self, num_retries=0):
+            return self._func()
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def _load(self):
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        return {'sheets': {}}
+
+    def _save(self, data):
+        tmp_file = f"{self.path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, self.path)
+
+    @staticmethod
+    def _sheet(data, title):
+        if title not in data['sheets']:
+            data['sheets'][title] = {'sheetId': len(data['sheets']), 'rows': []}
+        return data['sheets'][title]
+
+    @staticmethod
+    def _column_index(letters):
+        index = 0
+        for letter in letters:
+            index = index * 26 + (ord(letter) - ord('A') + 1)
+        return index - 1
+
+    @classmethod
+    def _parse_range(cls, range_name):
+        """'시트!A5:H' -> (시트, 시작 행, 끝 행, 시작 열, 끝 열), 행/열은 0부터, 끝은 미포함"""
+        title, cells = range_name.rsplit('!', 1)
+        start, _, end = cells.partition(':')
+        end = end or start
+
+        def split(cell):
+            letters = ''.join(c for c in cell if c.isalpha())
+            digits = ''.join(c for c in cell if c.isdigit())
+            return letters, int(digits) if digits else None
+
+        start_col, start_row = split(start)
+        end_col, end_row = split(end)
+        return (
+            title.strip("'"),
+            (start_row or 1) - 1,
+            end_row,
+            cls._column_index(start_col),
+            cls._column_index(end_col) + 1
+        )
+
+    @staticmethod
+    def _display(value):
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return '' if value is None else str(value)
+
+    def _write(self, rows, row_index, col_index, values):
+        for offset, row in enumerate(values):
+            while len(rows) <= row_index + offset:
+                rows.append([])
+            target = rows[row_index + offset]
+            while len(target) < col_index + len(row):
+                target.append('')
+            target[col_index:col_index + len(row)] = row
+
+    def get(self, spreadsheetId, range=None, fields=None):
+        def run():
+            with self._lock:
+                data = self._load()
+            if range is None:
+                return {'sheets': [
+                    {'properties': {'title': title, 'sheetId': sheet['sheetId']}}
+                    for title, sheet in data['sheets'].items()
+                ]}
+            title, row_start, row_end, col_start, col_end = self._parse_range(range)
+            rows = data['sheets'].get(title, {'rows': []})['rows'][row_start:row_end]
+            values = [[self._display(value) for value in row[col_start:col_end]] for row in rows]
+            while values and not any(values[-1]):
+                values.pop()
+            return {'range': range, 'values': [row for row in values]}
+        return self._Request(run)
+
+    def append(self, spreadsheetId, range, body, valueInputOption=None, insertDataOption=None):
+        def run():
+            with self._lock:
+                data = self._load()
+                title, _, _, col_start, _ = self._parse_range(range)
+                rows = self._sheet(data, title)['rows']
+                self._write(rows, len(rows), col_start, body.get('values', []))
+                self._save(data)
+            return {'updates': {'updatedRows': len(body.get('values', []))}}
+        return self._Request(run)
+
+    def update(self, spreadsheetId, range, body, valueInputOption=None):
+        def run():
+            with self._lock:
+                data = self._load()
+                title, row_start, _, col_start, _ = self._parse_range(range)
+                self._write(self._sheet(data, title)['rows'], row_start, col_start, body.get('values', []))
+                self._save(data)
+            return {'updatedRows': len(body.get('values', []))}
+        return self._Request(run)
+
+    def batchUpdate(self, spreadsheetId, body):
+        def run():
+            with self._lock:
+                data = self._load()
+                sheets_by_id = {sheet['sheetId']: sheet for sheet in data['sheets'].values()}
+                for request in body.get('requests', []):
+                    if 'insertDimension' in request:
+                        target = request['insertDimension']['range']
+                        rows = sheets_by_id[target['sheetId']]['rows']
+                        count = target['endIndex'] - target['startIndex']
+                        rows[target['startIndex']:target['startIndex']] = [[] for _ in range(count)]
+                    elif 'updateCells' in request:
+                        start = request['updateCells']['start']
+                        values = [
+                            [next(iter(cell.get('userEnteredValue', {'': ''}).values())) for cell in row['values']]
+                            for row in request['updateCells']['rows']
+                        ]
+                        rows = sheets_by_id[start['sheetId']]['rows']
+                        self._write(rows, start['rowIndex'], start['columnIndex'], values)
+                self._save(data)
+            return {'replies': [{} for _ in body.get('requests', [])]}
+        return self._Request(run)
+
+class LocalSheetsClient:
+    """로컬 JSON 파일을 쓰는 SheetsClient 대체 (service, get_sheet_id만 제공)"""
+
+    def __init__(self, path):
+        self.service = LocalSheetsService(path)
+
+    def get_sheet_id(self, title):
+        """시트 제목으로 sheetId 조회 (없으면 None)"""
+        metadata = self.service.get(spreadsheetId=None).execute()
+        for sheet in metadata['sheets']:
+            if sheet['properties']['title'] == title:
+                return sheet['properties']['sheetId']
+        return None
@@ -0,0 +1,233 @@
+# 출퇴근 기록 처리 단계별 성능 측정
+# 가상의 PC 시작/종료 이벤트를 만들어 로컬 JSON 시트(로컬시트.py)에 올린 뒤,
+# 시트 동기화부터 일자별/주차별 계산, 내보내기까지 단계별 처리량과 최대 메모리를 잰다.
+# 예) python 벤치마크.py --pcs 200 --months 6 --output 결과.json --baseline 이전결과.json
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+EVENT_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def generate_events(computers, start_date, months, seed=0, holidays=(),
+                    reboot_rate=0.1, crash_rate=0.02, overtime_rate=0.05,
+                    weekend_rate=0.03, absence_rate=0.05):
+    """PC별 가상 이벤트 [시각, 종류, 이벤트 ID, PC명] 목록 생성 (시각 순)
+
+    평일 아침 출근(6005)과 저녁 퇴근(6006)을 기본으로, 점심 재부팅, 비정상 종료 후 재시작(6008/6009),
+    자정을 넘긴 야근, 주말 출근, 결근과 공휴일을 섞는다.
+    비정상 종료는 Windows처럼 종료 기록을 남기지 않고, 다음 부팅 때 6009와 함께 6008을 남긴다.
+    """
+    rng = random.Random(seed)
+    holidays = set(holidays)
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = start + timedelta(days=round(months * 30.44))
+    rows = []
+
+    def add(moment, event_id, computer):
+        kind = '시작' if event_id in (6005, 6009) else '종료'
+        rows.append([moment.strftime(EVENT_TIME_FORMAT), kind, event_id, computer])
+
+    for computer in computers:
+        day = start
+        crashed = False
+        while day < end:
+            weekend = day.weekday() >= 5
+            off = day.strftime('%Y-%m-%d') in holidays or rng.random() < absence_rate
+            if (weekend and rng.random() >= weekend_rate) or (not weekend and off):
+                day += timedelta(days=1)
+                continue
+
+            boot = day + timedelta(minutes=rng.gauss(8 * 60 + 50, 20))
+            if crashed:
+                # 직전 종료가 비정상이었음을 부팅 직후에 기록
+                add(boot, 6009, computer)
+                add(boot + timedelta(seconds=rng.uniform(5, 30)), 6008, computer)
+            else:
+                add(boot, 6005, computer)
+            crashed = False
+
+            # 점심시간 재부팅
+            if rng.random() < reboot_rate:
+                down = day + timedelta(minutes=rng.uniform(11 * 60 + 50, 13 * 60))
+                add(down, 1074, computer)
+                add(down + timedelta(seconds=20), 6006, computer)
+                add(down + timedelta(minutes=rng.uniform(1, 4)), 6005, computer)
+
+            if rng.random() < crash_rate:
+                # 종료 기록 없이 꺼짐 (다음 부팅 때 6008이 남음)
+                crashed = True
+            else:
+                hours = rng.gauss(9.2, 0.5)
+                if rng.random() < overtime_rate:
+                    hours += rng.uniform(4, 7)  # 자정을 넘길 수 있음
+                add(boot + timedelta(hours=hours), 6006, computer)
+            day += timedelta(days=1)
+
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+def measure(name, func, items=None):
+    """func 실행 시간과 최대 메모리 측정, (결과, 측정값) 반환
+
+    tracemalloc을 켠 채로 재므로 시간은 실제보다 길게 나오며, 이전 결과와의 비교용으로 쓴다.
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = items(result) if callable(items) else items
+    stats = {
+        'stage': name,
+        'seconds': round(elapsed, 4),
+        'peak_mb': round(peak / 2**20, 2),
+        'items': count,
+        'items_per_second': round(count / elapsed) if count and elapsed else None,
+    }
+    print(f"{name:<24} {stats['seconds']:>9.3f}s  {stats['peak_mb']:>8.1f}MB"
+          f"  {count if count is not None else '':>9}  {stats['items_per_second'] or '':>10}/s", flush=True)
+    return result, stats
+
+def compare(results, baseline_file, tolerance):
+    """이전 결과보다 tolerance배 넘게 느려진 단계 목록"""
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = {stage['stage']: stage for stage in json.load(f)['stages']}
+    slower = []
+    for stage in results:
+        before = baseline.get(stage['stage'])
+        if before and before['seconds'] and stage['seconds'] > before['seconds'] * tolerance:
+            slower.append(f"{stage['stage']}: {before['seconds']:.3f}s -> {stage['seconds']:.3f}s")
+    return slower
+
+def main():
+    parser = argparse.ArgumentParser(description="출퇴근 기록 처리 성능 측정")
+    parser.add_argument('--pcs', type=int, default=100, help="PC 수")
+    parser.add_argument('--months', type=float, default=3, help="기간 (개월)")
+    parser.add_argument('--start', default='2025-01-01', help="시작일 (YYYY-MM-DD)")
+    parser.add_argument('--seed', type=int, default=0, help="난수 시드")
+    parser.add_argument('--calls', type=int, default=2000, help="calculate_work_hours 호출 수")
+    parser.add_argument('--workdir', help="작업 폴더 (기본: 임시 폴더)")
+    parser.add_argument('--output', help="결과 저장 파일 (.json)")
+    parser.add_argument('--baseline', help="비교할 이전 결과 파일 (.json)")
+    parser.add_argument('--tolerance', type=float, default=1.5, help="허용 배수 (기본 1.5배)")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+
+    # 계산 모듈은 작업 폴더의 로컬 파일(저장소, 가짜 시트)만 쓰도록 한 뒤 불러온다
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix='attendance_bench_'))
+    os.makedirs(workdir, exist_ok=True)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(workdir)
+    os.environ['ATTENDANCE_DATA_DIR'] = workdir
+    os.environ['SHEETS_LOCAL_FILE'] = os.path.join(workdir, 'sheets.json')
+    os.environ['EVENT_STORE_REFRESH_SECONDS'] = '0'
+    import pandas as pd
+    import 출퇴근엔진 as app
+
+    computer_name = platform.node()
+    computers = [computer_name] + [f"PC{i:04d}" for i in range(1, args.pcs)]
+    end_dt = datetime.strptime(args.start, '%Y-%m-%d') + timedelta(days=round(args.months * 30.44) - 1)
+    end_date = end_dt.strftime('%Y-%m-%d')
+    holidays = app.get_holiday_store().public_holidays(args.start, end_date)
+
+    print(f"작업 폴더: {workdir}")
+    print(f"PC {args.pcs}대, {args.start} ~ {end_date}")
+    print(f"{'단계':<24} {'시간':>10}  {'최대 메모리':>9}  {'건수':>9}  {'처리량':>12}")
+    stages = []
+
+    rows, stats = measure('generate_events', lambda: generate_events(
+        computers, args.start, args.months, args.seed, holidays), len)
+    stages.append(stats)
+
+    def upload():
+        events = [{'time': datetime.strptime(row[0], EVENT_TIME_FORMAT), 'type': row[1],
+                   'event_id': row[2], 'computer': row[3]} for row in rows]
+        app.append_events_to_sheet(events)
+        return events
+    _, stats = measure('append_events_to_sheet', upload, len(rows))
+    stages.append(stats)
+
+    store = app.get_event_store()
+    _, stats = measure('event_store.refresh', lambda: store.refresh(force=True), lambda added: added)
+    stages.append(stats)
+
+    # 수집기가 읽는 이벤트 로그를 파일로 흉내 낸다 (FileEventSource.record처럼 최신 기록부터)
+    source_file = os.path.join(workdir, 'event_log.jsonl')
+    local_rows = [row for row in rows if row[3] == computer_name]
+    with open(source_file, 'w', encoding='utf-8') as f:
+        for number, row in reversed(list(enumerate(local_rows, 1))):
+            f.write(json.dumps({'record_number': number, 'time': row[0], 'event_id': row[2]}) + '\n')
+    source = app.FileEventSource(source_file)
+    _, stats = measure('select_new_events', lambda: app.select_new_events(
+        source.iter_records(), computer_name)[0], len)
+    stages.append(stats)
+
+    start_dt, query_end = app.parse_date_window(args.start, end_date)
+    events_df, stats = measure('event_store.query', lambda: store.query(
+        start_dt - timedelta(days=1), query_end)[app.EVENT_COLUMNS], len)
+    stages.append(stats)
+
+    samples = [
+        (datetime.strptime(row[0], EVENT_TIME_FORMAT), datetime.strptime(row[0], EVENT_TIME_FORMAT) + timedelta(hours=9))
+        for row in rows[:args.calls]
+    ]
+    _, stats = measure('calculate_work_hours', lambda: [
+        app.calculate_work_hours(start, stop, start.replace(hour=0, minute=0, second=0)) for start, stop in samples
+    ], len(samples))
+    stages.append(stats)
+
+    sessions, stats = measure('sessionize_events', lambda: app.sessionize_events(
+        events_df.assign(time=pd.to_datetime(events_df['time']))), len)
+    stages.append(stats)
+
+    daily, stats = measure('build_daily_records', lambda: app.build_daily_records(
+        events_df, args.start, end_date, computers), len)
+    stages.append(stats)
+
+    _, stats = measure('calculate_weekly_stats', lambda: app.calculate_weekly_stats(daily, by=['PC']), len)
+    stages.append(stats)
+
+    aggregates = app.get_attendance_aggregates()
+    _, stats = measure('aggregates.ensure (1 PC)', lambda: aggregates.ensure(
+        computer_name, '', args.start, end_date), lambda weeks: weeks)
+    stages.append(stats)
+    _, stats = measure('aggregates.monthly (1 PC)', lambda: aggregates.monthly(
+        computer_name, '', args.start[:7], end_date[:7]), len)
+    stages.append(stats)
+
+    job = app.ExportJob('csv', args.start, end_date)
+    _, stats = measure('export_attendance (csv)', lambda: app.export_attendance(
+        job, computers, export_dir=os.path.join(workdir, 'exports')), lambda done: done.rows)
+    stages.append(stats)
+    if job.status != 'done':
+        print(f"내보내기 실패: {job.error}")
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'pcs': args.pcs, 'months': args.months, 'start': args.start, 'seed': args.seed,
+                'python': platform.python_version(), 'stages': stages,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {output}")
+
+    if baseline:
+        slower = compare(stages, baseline, args.tolerance)
+        if slower:
+            print(f"{args.tolerance}배 넘게 느려진 단계:")
+            for line in slower:
+                print(f"  {line}")
+            sys.exit(1)
+        print("이전 결과 대비 느려진 단계 없음")
+
+if __name__ == "__main__":
+    main()
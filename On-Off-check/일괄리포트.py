@@ -0,0 +1,111 @@
+# PC_Events 시트의 모든 PC에 대한 일자별/주차별 근무 기록을 한 번에 계산해 파일로 저장
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from 출퇴근엔진 import (
+    EVENT_COLUMNS,
+    build_attendance_report,
+    get_event_store,
+    parse_date_window,
+)
+
+def load_employee_map(path):
+    """PC명 -> 직원명 매핑 로드 (CSV: computer, employee)"""
+    if not path:
+        return {}
+    df = pd.read_csv(path, dtype=str)
+    return dict(zip(df['computer'], df['employee']))
+
+def split_computers(computers, chunk_count):
+    """PC 목록을 chunk_count개 묶음으로 나누기"""
+    chunk_count = max(1, min(chunk_count, len(computers)))
+    return [computers[i::chunk_count] for i in range(chunk_count)]
+
+def report_chunk(args):
+    """PC 묶음 하나의 리포트 계산 (작업 프로세스에서 실행)"""
+    events_df, start_date, end_date, computers, employees = args
+    return build_attendance_report(events_df, start_date, end_date, computers, employees)
+
+def build_batch_report(events_df, start_date, end_date, workers=None, employee_map=None):
+    """모든 PC의 리포트를 병렬로 계산해 하나로 합치기 (직원별 개인 휴가 반영)"""
+    employee_map = employee_map or {}
+    computers = sorted(events_df['computer'].unique())
+    if not computers:
+        return build_attendance_report(events_df, start_date, end_date, [])
+
+    workers = workers or os.cpu_count() or 1
+    chunks = split_computers(computers, workers)
+    tasks = [
+        (events_df[events_df['computer'].isin(chunk)], start_date, end_date, chunk,
+         {computer: employee_map[computer] for computer in chunk if computer in employee_map})
+        for chunk in chunks
+    ]
+
+    if len(tasks) == 1:
+        results = [report_chunk(tasks[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+            results = list(executor.map(report_chunk, tasks))
+
+    daily = pd.concat([result[0] for result in results], ignore_index=True)
+    weekly = pd.concat([result[1] for result in results], ignore_index=True)
+    daily = daily.sort_values(['PC', '날짜'], ignore_index=True)
+    weekly = weekly.sort_values(['PC', '주차'], ascending=[True, False], ignore_index=True)
+    return daily, weekly
+
+def write_report(daily, weekly, output):
+    """결과 저장 (.xlsx는 시트 2개, .csv는 일자별/주차별 파일 2개)"""
+    if output.lower().endswith('.xlsx'):
+        with pd.ExcelWriter(output) as writer:
+            daily.to_excel(writer, sheet_name='일자별', index=False)
+            weekly.to_excel(writer, sheet_name='주차별', index=False)
+        return [output]
+
+    base, ext = os.path.splitext(output)
+    weekly_output = f"{base}_주차별{ext or '.csv'}"
+    daily.to_csv(output, index=False, encoding='utf-8-sig')
+    weekly.to_csv(weekly_output, index=False, encoding='utf-8-sig')
+    return [output, weekly_output]
+
+def main():
+    yesterday = datetime.now().date() - timedelta(days=1)
+    parser = argparse.ArgumentParser(description="전체 PC 출퇴근 기록 일괄 리포트")
+    parser.add_argument('--start', default=(yesterday - timedelta(days=6)).strftime('%Y-%m-%d'), help="시작일 (YYYY-MM-DD)")
+    parser.add_argument('--end', default=yesterday.strftime('%Y-%m-%d'), help="종료일 (YYYY-MM-DD)")
+    parser.add_argument('--output', default='출퇴근_일괄리포트.xlsx', help="저장 파일 (.xlsx 또는 .csv)")
+    parser.add_argument('--employees', help="PC명-직원명 매핑 CSV (computer, employee)")
+    parser.add_argument('--workers', type=int, help="작업 프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--no-refresh', action='store_true', help="구글 시트 동기화 없이 로컬 저장소만 사용")
+    args = parser.parse_args()
+
+    # 엑셀 저장은 openpyxl이 필요하므로 PC별 계산을 시작하기 전에 확인
+    if args.output.lower().endswith('.xlsx'):
+        try:
+            import openpyxl
+        except ImportError:
+            parser.error("엑셀(.xlsx) 저장에는 openpyxl 패키지가 필요합니다 (pip install openpyxl). .csv로 저장하려면 --output을 바꾸세요.")
+
+    store = get_event_store()
+    if not args.no_refresh:
+        added = store.refresh(force=True)
+        print(f"구글 시트에서 새 이벤트 {added}건을 가져왔습니다.")
+
+    # 모든 PC의 이벤트를 한 번만 조회 (자정을 넘긴 세션을 위해 하루 전부터)
+    start_dt, end_dt = parse_date_window(args.start, args.end)
+    events_df = store.query(start_dt - timedelta(days=1), end_dt)[EVENT_COLUMNS]
+
+    employee_map = load_employee_map(args.employees)
+    daily, weekly = build_batch_report(events_df, args.start, args.end, args.workers, employee_map)
+
+    daily.insert(0, '직원명', daily['PC'].map(employee_map).fillna(''))
+    weekly.insert(0, '직원명', weekly['PC'].map(employee_map).fillna(''))
+
+    outputs = write_report(daily.drop(columns=['근무분']), weekly, args.output)
+    print(f"PC {daily['PC'].nunique()}대, {args.start} ~ {args.end} 리포트 저장: {', '.join(outputs)}")
+
+if __name__ == "__main__":
+    main()
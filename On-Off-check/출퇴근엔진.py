@@ -0,0 +1,1980 @@
+# 출퇴근 기록 저장소와 근무시간 계산 (Streamlit 없이 쓰는 부분)
+# 웹앱(출퇴근기록_웹앱.py), PC 이벤트 수집기, 일괄 리포트, 벤치마크가 함께 불러온다.
+# 저장소/설정 파일은 실행 폴더가 아니라 이 파일이 있는 폴더(또는 ATTENDANCE_DATA_DIR) 기준으로 찾는다.
+import json
+import logging
+import os
+import platform
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+import httplib2
+import numpy as np
+import pandas as pd
+from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+
+try:
+    import tomllib
+except ImportError:  # Python 3.10 이하는 GOOGLE_SERVICE_ACCOUNT 환경 변수로만 설정
+    tomllib = None
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = str(Path(__file__).resolve().parent)
+DATA_DIR = os.environ.get('ATTENDANCE_DATA_DIR') or APP_DIR
+
+# 공휴일 패키지가 있으면 새 연도 공휴일을 자동으로 채움
+try:
+    import holidays as kr_holidays
+except ImportError:
+    kr_holidays = None
+    logger.warning("holidays 패키지가 없어 기본 목록에 없는 연도의 공휴일은 CSV로 가져와야 합니다.")
+
+# 내보내기 형식별 선택 패키지 (없으면 해당 형식만 사용할 수 없음)
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+    logger.warning("openpyxl 패키지가 없어 Excel 내보내기를 사용할 수 없습니다.")
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+    logger.warning("pyarrow 패키지가 없어 Parquet 내보내기를 사용할 수 없습니다.")
+
+# Windows 환경에서만 import
+if os.name == 'nt':
+    import win32evtlog
+    import win32evtlogutil
+    import win32con
+
+CUSTOM_HOLIDAY_FILE = os.path.join(DATA_DIR, 'custom_holidays.csv')  # 이전 버전의 자체 휴가 파일 (최초 1회 저장소로 옮김)
+HOLIDAY_STORE_FILE = os.path.join(DATA_DIR, 'holidays.db')
+HOLIDAY_CHECK_SECONDS = 5  # 다른 프로세스의 휴가 변경을 확인하는 주기
+
+# 기본 공휴일 목록 (저장소에 해당 연도가 없을 때 채워 넣는 초기값)
+PUBLIC_HOLIDAYS = {
+    # 기존 공휴일 목록
+    "2024-01-01": "신정",
+    "2024-02-09": "설날",
+    "2024-02-10": "설날",
+    "2024-02-11": "설날",
+    "2024-02-12": "대체공휴일(설날)",
+    "2024-03-01": "삼일절",
+    "2024-04-10": "21대 총선",
+    "2024-05-05": "어린이날",
+    "2024-05-06": "대체공휴일(어린이날)",
+    "2024-05-15": "부처님오신날",
+    "2024-06-06": "현충일",
+    "2024-08-15": "광복절",
+    "2024-09-16": "추석",
+    "2024-09-17": "추석",
+    "2024-09-18": "추석",
+    "2024-10-03": "개천절",
+    "2024-10-09": "한글날",
+    "2024-12-25": "크리스마스",
+    "2024-12-26": "겨울방학",
+    "2024-12-27": "겨울방학",
+    "2024-12-30": "겨울방학",
+    "2024-12-31": "겨울방학",    
+
+    # 2025년 공휴일
+    "2025-01-01": "신정",
+    "2025-01-27": "임시공휴일",
+    "2025-01-28": "설날",
+    "2025-01-29": "설날",
+    "2025-01-30": "설날",
+    "2025-03-01": "삼일절",
+    "2025-05-05": "어린이날",
+    "2025-05-06": "부처님오신날",
+    "2025-06-06": "현충일",
+    "2025-08-15": "광복절",
+    "2025-10-03": "개천절",
+    "2025-10-09": "한글날",
+    "2025-12-25": "크리스마스"
+}
+
+class HolidayStore:
+    """공휴일/자체 휴가 저장소 (SQLite)
+
+    공휴일은 연도별로 나누어 (year, date) 키로, 자체 휴가는 (employee, date) 키로 보관한다.
+    조회는 키 색인으로 처리하고, 휴가 추가/삭제는 해당 행만 쓴다.
+    쓰기마다 version을 올려 캐시가 변경 여부를 값 하나로 확인할 수 있게 한다.
+    """
+
+    def __init__(self, path=HOLIDAY_STORE_FILE):
+        self.path = path
+        self.writes = 0  # 이 프로세스에서의 쓰기 횟수 (즉시 무효화용)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS public_holidays (
+                    year INTEGER NOT NULL,
+                    date TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    PRIMARY KEY (year, date)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS custom_leave (
+                    employee TEXT NOT NULL DEFAULT '',
+                    date TEXT NOT NULL,
+                    description TEXT NOT NULL DEFAULT '',
+                    PRIMARY KEY (employee, date)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_custom_leave_date ON custom_leave (date);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _bump_version(self, conn):
+        self.writes += 1
+        conn.execute("""
+            INSERT INTO meta (key, value) VALUES ('version', '1')
+            ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        """)
+
+    def version(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def public_years(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute('SELECT DISTINCT year FROM public_holidays ORDER BY year')]
+
+    def set_public_year(self, year, holidays):
+        """해당 연도의 공휴일 목록 교체 (holidays: 'YYYY-MM-DD' -> 이름)"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM public_holidays WHERE year = ?', (year,))
+            conn.executemany(
+                'INSERT INTO public_holidays (year, date, name) VALUES (?, ?, ?)',
+                [(year, date, name) for date, name in holidays.items() if date.startswith(f"{year}-")]
+            )
+            self._bump_version(conn)
+
+    def public_holidays(self, start=None, end=None):
+        """기간(포함) 내 공휴일 ('YYYY-MM-DD' -> 이름)"""
+        query = 'SELECT date, name FROM public_holidays'
+        params = []
+        if start and end:
+            query += ' WHERE year BETWEEN ? AND ? AND date BETWEEN ? AND ?'
+            params = [int(start[:4]), int(end[:4]), start, end]
+        with self._connect() as conn:
+            return dict(conn.execute(query + ' ORDER BY date', params).fetchall())
+
+    def ensure_public_year(self, year):
+        """해당 연도의 공휴일이 없으면 채우기 (기본 목록 또는 holidays 패키지), 채웠으면 True"""
+        with self._connect() as conn:
+            exists = conn.execute('SELECT 1 FROM public_holidays WHERE year = ? LIMIT 1', (year,)).fetchone()
+        if exists:
+            return False
+
+        holidays = {date: name for date, name in PUBLIC_HOLIDAYS.items() if date.startswith(f"{year}-")}
+        if not holidays and kr_holidays is not None:
+            holidays = {
+                date.strftime('%Y-%m-%d'): name
+                for date, name in sorted(kr_holidays.KR(years=year, language='ko').items())
+            }
+        if not holidays:
+            return False
+        self.set_public_year(year, holidays)
+        return True
+
+    def import_public_csv(self, file):
+        """공휴일 CSV(date, name) 가져오기, 파일에 있는 연도는 통째로 교체"""
+        df = pd.read_csv(file, dtype=str)
+        df['year'] = df['date'].str[:4].astype(int)
+        for year, rows in df.groupby('year'):
+            self.set_public_year(int(year), dict(zip(rows['date'], rows['name'])))
+        return len(df)
+
+    def add_leave(self, date, description, employee=''):
+        """자체 휴가 추가 (이미 있으면 False)"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO custom_leave (employee, date, description) VALUES (?, ?, ?)',
+                (employee, date, description)
+            )
+            if cursor.rowcount:
+                self._bump_version(conn)
+            return cursor.rowcount > 0
+
+    def delete_leave(self, date, employee=''):
+        """자체 휴가 삭제 (없으면 False)"""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'DELETE FROM custom_leave WHERE employee = ? AND date = ?', (employee, date)
+            )
+            if cursor.rowcount:
+                self._bump_version(conn)
+            return cursor.rowcount > 0
+
+    def custom_leave(self, employee=None, start=None, end=None):
+        """자체 휴가 목록 [(직원, 날짜, 설명)] (employee가 None이면 전체)"""
+        conditions = []
+        params = []
+        if employee is not None:
+            conditions.append('employee = ?')
+            params.append(employee)
+        if start and end:
+            conditions.append('date BETWEEN ? AND ?')
+            params += [start, end]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self._connect() as conn:
+            return conn.execute(
+                f'SELECT employee, date, description FROM custom_leave {where} ORDER BY employee, date',
+                params
+            ).fetchall()
+
+    def migrate_csv(self, custom_holiday_file=CUSTOM_HOLIDAY_FILE):
+        """이전 버전의 자체 휴가 CSV를 한 번만 저장소로 옮기기"""
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_csv'").fetchone():
+                return 0
+            count = 0
+            try:
+                if os.path.exists(custom_holiday_file):
+                    df = pd.read_csv(custom_holiday_file, dtype=str).fillna('')
+                    rows = [('', date, desc) for date, desc in zip(df['date'], df['description'])]
+                    conn.executemany(
+                        'INSERT OR IGNORE INTO custom_leave (employee, date, description) VALUES (?, ?, ?)', rows
+                    )
+                    count = len(rows)
+            except Exception:
+                pass
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_csv', '1')")
+            self._bump_version(conn)
+            return count
+
+@lru_cache(maxsize=None)
+def get_holiday_store():
+    """세션 간 공유되는 공휴일/휴가 저장소"""
+    store = HolidayStore()
+    store.migrate_csv()
+    for year in sorted({int(date[:4]) for date in PUBLIC_HOLIDAYS}):
+        store.ensure_public_year(year)
+    return store
+
+def load_custom_holidays(employee=''):
+    """자체 휴가 목록 로드 (employee가 ''이면 전 직원 공통 휴무)"""
+    try:
+        return {date: desc for _, date, desc in get_holiday_store().custom_leave(employee=employee)}
+    except Exception:
+        return {}
+
+def save_custom_holiday(date, description, employee=''):
+    """자체 휴가 추가"""
+    try:
+        return get_holiday_store().add_leave(date, description, employee)
+    except Exception:
+        return False
+
+def delete_custom_holiday(date, employee=''):
+    """자체 휴가 삭제"""
+    try:
+        return get_holiday_store().delete_leave(date, employee)
+    except Exception:
+        return False
+
+class HolidayCalendar:
+    """공휴일/자체 휴가 달력
+
+    날짜 서수(date.toordinal) 기준 정렬 배열로 보관하고,
+    저장소의 version이 바뀐 경우에만 다시 읽는다.
+    자체 휴가는 직원명 -> (정렬된 날짜 서수 배열, 설명 배열)로 나누어 두며,
+    직원명 ''은 전 직원 공통 휴무로 공휴일과 같이 취급한다.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._version = None
+        self._writes = None
+        self._checked = 0.0
+        self._loaded = False
+        self._ordinals = np.array([], dtype=np.int64)
+        self._names = {}
+        self._custom = {}
+        self._leave = {}
+        self._leave_by_day = {}
+
+    def ensure_years(self, years):
+        """해당 연도들의 공휴일이 저장소에 없으면 채우기"""
+        for year in years:
+            self.store.ensure_public_year(int(year))
+
+    def _refresh(self):
+        """저장소가 바뀐 경우 인덱스 재구성"""
+        now = time.monotonic()
+        if (self._loaded and self._writes == self.store.writes
+                and now - self._checked < HOLIDAY_CHECK_SECONDS):
+            return
+        writes = self.store.writes
+        version = self.store.version()
+        self._checked = now
+        self._writes = writes
+        if self._loaded and version == self._version:
+            return
+        with self._lock:
+            if self._loaded and version == self._version:
+                return
+            names = {
+                datetime.strptime(date, '%Y-%m-%d').toordinal(): name
+                for date, name in self.store.public_holidays().items()
+            }
+            by_employee = {}
+            for employee, date, desc in self.store.custom_leave():
+                try:
+                    ordinal = datetime.strptime(str(date), '%Y-%m-%d').toordinal()
+                except ValueError:
+                    continue
+                by_employee.setdefault(employee, {})[ordinal] = desc
+            leave = {
+                employee: (np.array(sorted(days), dtype=np.int64),
+                           np.array([days[ordinal] for ordinal in sorted(days)], dtype=object))
+                for employee, days in by_employee.items()
+            }
+            custom = by_employee.get('', {})
+            names.update(custom)
+
+            self._names = names
+            self._custom = custom
+            self._leave = leave
+            self._leave_by_day = by_employee
+            self._ordinals = np.array(sorted(names), dtype=np.int64)
+            self._version = version
+            self._loaded = True
+
+    def is_holiday(self, date):
+        self._refresh()
+        return date.toordinal() in self._names
+
+    def has_leave(self, employee):
+        """해당 직원의 개인 휴가가 하나라도 있는지 ('' 공통 휴무는 제외)"""
+        self._refresh()
+        return bool(employee) and employee in self._leave
+
+    def is_custom(self, date, employee=''):
+        return self.get_custom_name(date, employee) is not None
+
+    def get_name(self, date):
+        self._refresh()
+        return self._names.get(date.toordinal())
+
+    def get_custom_name(self, date, employee=''):
+        """해당 직원의 휴가 설명 (개인 휴가 우선, 없으면 공통 휴무, 둘 다 없으면 None)"""
+        self._refresh()
+        ordinal = date.toordinal()
+        name = self._leave_by_day.get(employee, {}).get(ordinal) if employee else None
+        return name if name is not None else self._custom.get(ordinal)
+
+    @staticmethod
+    def _member(sorted_ordinals, ordinals):
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        if not len(sorted_ordinals):
+            return np.zeros(ordinals.shape, dtype=bool)
+        pos = np.searchsorted(sorted_ordinals, ordinals)
+        pos = np.minimum(pos, len(sorted_ordinals) - 1)
+        return sorted_ordinals[pos] == ordinals
+
+    def contains(self, ordinals):
+        """날짜 서수 배열에 대한 공휴일 여부 (이진 탐색)"""
+        self._refresh()
+        return self._member(self._ordinals, ordinals)
+
+    def leave(self, employees, ordinals):
+        """행별 (직원명, 날짜 서수)에 대한 자체 휴가 여부와 설명
+
+        직원별로 묶어 그 직원의 날짜 배열에서 이진 탐색하므로,
+        직원 수와 관계없이 행마다 전체 휴가 목록을 뒤지지 않는다.
+        """
+        self._refresh()
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        mask = np.zeros(len(ordinals), dtype=bool)
+        names = np.full(len(ordinals), None, dtype=object)
+
+        def apply(rows, employee):
+            if employee not in self._leave or not len(rows):
+                return
+            days, descs = self._leave[employee]
+            pos = np.minimum(np.searchsorted(days, ordinals[rows]), len(days) - 1)
+            hit = days[pos] == ordinals[rows]
+            mask[rows[hit]] = True
+            names[rows[hit]] = descs[pos[hit]]
+
+        apply(np.arange(len(ordinals)), '')  # 공통 휴무
+        codes, uniques = pd.factorize(pd.Series(employees, dtype=object).fillna(''))
+        order = np.argsort(codes, kind='stable')
+        bounds = np.cumsum(np.bincount(codes, minlength=len(uniques)))[:-1]
+        for employee, rows in zip(uniques, np.split(order, bounds)):
+            if employee:
+                apply(rows, employee)  # 개인 휴가가 공통 휴무보다 우선
+        return mask, names
+
+    def names(self, ordinals):
+        """날짜 서수 배열에 대한 공휴일/휴가 이름 (없으면 None)"""
+        self._refresh()
+        return np.array([self._names.get(int(ordinal)) for ordinal in ordinals], dtype=object)
+
+@lru_cache(maxsize=None)
+def get_holiday_calendar():
+    """세션 간 공유되는 공휴일 달력"""
+    return HolidayCalendar(get_holiday_store())
+
+SPREADSHEET_ID = '1-xF7-9VK3Ty5-ARnp0RSqyzrYJXmhW1phaPZTX42SLs'
+SHEETS_SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+SECRETS_FILES = [
+    os.path.join(APP_DIR, '.streamlit', 'secrets.toml'),
+    os.path.join(os.path.expanduser('~'), '.streamlit', 'secrets.toml'),
+]
+
+class SheetsClient:
+    """Google Sheets API 클라이언트
+
+    서비스 계정 인증 정보(액세스 토큰 포함)는 하나를 공유하고, 만료될 때만 토큰을 갱신한다.
+    httplib2 연결은 스레드 간 공유할 수 없어 스레드마다 한 번만 만들어 재사용한다.
+    """
+
+    def __init__(self, service_account_info, scopes=SHEETS_SCOPES):
+        self.credentials = service_account.Credentials.from_service_account_info(
+            service_account_info,
+            scopes=scopes
+        )
+        self._local = threading.local()
+        self._sheet_ids = {}
+
+    @property
+    def service(self):
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=60))
+            service = build('sheets', 'v4', http=http, cache_discovery=False)
+            self._local.service = service
+        return service
+
+    def get_sheet_id(self, title):
+        """시트 제목으로 sheetId 조회 (시트 속성만 요청하고 결과를 캐시)"""
+        if title not in self._sheet_ids:
+            metadata = self.service.spreadsheets().get(
+                spreadsheetId=SPREADSHEET_ID,
+                fields='sheets.properties(sheetId,title)'
+            ).execute()
+            self._sheet_ids = {
+                sheet['properties']['title']: sheet['properties']['sheetId']
+                for sheet in metadata.get('sheets', [])
+            }
+        return self._sheet_ids.get(title)
+
+def load_service_account_info():
+    """서비스 계정 인증 정보 로드
+
+    GOOGLE_SERVICE_ACCOUNT 환경 변수(JSON)를 먼저 보고, 없으면 웹앱과 같은 secrets.toml의
+    google_service_account 값을 읽는다 (작업 스케줄러처럼 다른 폴더에서 실행해도 앱 폴더 기준).
+    """
+    info = os.environ.get('GOOGLE_SERVICE_ACCOUNT')
+    if info:
+        return json.loads(info)
+    for path in SECRETS_FILES:
+        if tomllib is not None and os.path.exists(path):
+            with open(path, 'rb') as f:
+                secrets = tomllib.load(f)
+            if 'google_service_account' in secrets:
+                return json.loads(secrets['google_service_account'])
+    raise RuntimeError(
+        "Google 서비스 계정 정보가 없습니다. GOOGLE_SERVICE_ACCOUNT 환경 변수나 .streamlit/secrets.toml을 설정하세요."
+    )
+
+@lru_cache(maxsize=None)
+def get_sheets_client():
+    """세션 간 공유되는 Google Sheets 클라이언트"""
+    local_file = os.environ.get('SHEETS_LOCAL_FILE')
+    if local_file:
+        # 개발/테스트용 로컬 JSON 시트 (실제 배포에서는 불러오지 않음)
+        from 로컬시트 import LocalSheetsClient
+        return LocalSheetsClient(local_file)
+    service_account_info = load_service_account_info()
+    return SheetsClient(service_account_info)
+
+SHEETS_ROWS_PER_REQUEST = 500  # updateCells 요청 하나에 담을 행 수
+SHEETS_ROWS_PER_CALL = 5000  # batchUpdate 호출 하나에 담을 행 수
+
+def to_cell_data(value):
+    """값을 updateCells용 CellData로 변환 (RAW 입력과 동일하게 문자열은 그대로)"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return {}
+    if isinstance(value, bool):
+        return {'userEnteredValue': {'boolValue': value}}
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return {'userEnteredValue': {'numberValue': float(value)}}
+    return {'userEnteredValue': {'stringValue': str(value)}}
+
+def update_cells_request(sheet_id, row_index, values):
+    """row_index(0부터) 행부터 values를 채우는 updateCells 요청"""
+    return {
+        'updateCells': {
+            'start': {'sheetId': sheet_id, 'rowIndex': row_index, 'columnIndex': 0},
+            'rows': [{'values': [to_cell_data(value) for value in row]} for row in values],
+            'fields': 'userEnteredValue'
+        }
+    }
+
+def execute_batch_update(service, requests, rows_per_call=SHEETS_ROWS_PER_CALL):
+    """(요청, 행 수) 목록을 행 수 기준으로 나누어 batchUpdate, 호출 횟수 반환"""
+    calls = 0
+    pending = []
+    pending_rows = 0
+    for request, rows in requests:
+        if pending and pending_rows + rows > rows_per_call:
+            service.spreadsheets().batchUpdate(spreadsheetId=SPREADSHEET_ID, body={'requests': pending}).execute()
+            calls += 1
+            pending = []
+            pending_rows = 0
+        pending.append(request)
+        pending_rows += rows
+    if pending:
+        service.spreadsheets().batchUpdate(spreadsheetId=SPREADSHEET_ID, body={'requests': pending}).execute()
+        calls += 1
+    return calls
+
+def insert_rows_requests(sheet_id, row_index, values, rows_per_request=SHEETS_ROWS_PER_REQUEST):
+    """row_index(0부터) 위치에 행을 삽입하고 값을 채우는 (요청, 행 수) 목록"""
+    requests = [({
+        'insertDimension': {
+            'range': {
+                'sheetId': sheet_id,
+                'dimension': 'ROWS',
+                'startIndex': row_index,
+                'endIndex': row_index + len(values)
+            },
+            'inheritFromBefore': False
+        }
+    }, 0)]
+    for offset in range(0, len(values), rows_per_request):
+        chunk = values[offset:offset + rows_per_request]
+        requests.append((update_cells_request(sheet_id, row_index + offset, chunk), len(chunk)))
+    return requests
+
+TRACKED_EVENT_IDS = frozenset([6005, 6006, 6008, 6009, 1074])  # PC 시작/종료 관련 이벤트
+START_EVENT_IDS = frozenset([6005, 6009])
+EVENT_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+WATERMARK_FILE = os.path.join(DATA_DIR, 'pc_events_watermark.json')
+
+class EventSource:
+    """PC 이벤트 원본
+
+    iter_records()는 {'record_number', 'time', 'event_id'} 레코드를
+    최신 기록부터 차례로 반환한다.
+    """
+
+    def iter_records(self):
+        raise NotImplementedError
+
+class WindowsEventSource(EventSource):
+    """Windows 시스템 이벤트 로그"""
+
+    def __init__(self, log_type="System", server=None):
+        self.log_type = log_type
+        self.server = server
+
+    def iter_records(self):
+        hand = win32evtlog.OpenEventLog(self.server, self.log_type)
+        flags = win32evtlog.EVENTLOG_BACKWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ
+        try:
+            while True:
+                events_raw = win32evtlog.ReadEventLog(hand, flags, 0)
+                if not events_raw:
+                    break
+
+                for event in events_raw:
+                    yield {
+                        'record_number': event.RecordNumber,
+                        'time': event.TimeGenerated.replace(tzinfo=None),
+                        'event_id': event.EventID & 0xFFFF
+                    }
+        finally:
+            win32evtlog.CloseEventLog(hand)
+
+class FileEventSource(EventSource):
+    """파일 기반 이벤트 원본 (테스트/Linux용)
+
+    한 줄에 하나씩 {"record_number": 1, "time": "2025-01-02 09:00:00", "event_id": 6005}
+    형식의 JSON 레코드를 읽는다. record()로 저장한 파일처럼 최신 기록부터 쓰인 파일은 앞에서부터,
+    기록이 끝에 덧붙는 파일은 뒤에서부터 블록 단위로 읽어, 읽기를 멈추면 나머지는 읽지 않는다.
+    """
+
+    BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def _parse(line):
+        row = json.loads(line)
+        return {
+            'record_number': int(row['record_number']),
+            'time': datetime.strptime(row['time'], EVENT_TIME_FORMAT),
+            'event_id': int(row['event_id'])
+        }
+
+    def _lines_reversed(self, f):
+        """파일 끝에서부터 한 줄씩 반환 (바이너리 모드 파일)"""
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b''
+        while position > 0:
+            size = min(self.BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + tail).split(b'\n')
+            tail = lines.pop(0)  # 블록 경계에 걸린 줄은 앞 블록과 합쳐서 처리
+            for line in reversed(lines):
+                yield line
+        yield tail
+
+    def iter_records(self):
+        with open(self.path, 'rb') as f:
+            first = next((line for line in f if line.strip()), None)
+            if first is None:
+                return
+            last = next(line for line in self._lines_reversed(f) if line.strip())
+            if self._parse(first)['record_number'] < self._parse(last)['record_number']:
+                lines = self._lines_reversed(f)  # 오래된 기록부터 쓰인 파일
+            else:
+                f.seek(0)
+                lines = f
+            for line in lines:
+                if line.strip():
+                    yield self._parse(line)
+
+    @staticmethod
+    def record(source, path, limit=None):
+        """다른 이벤트 원본의 기록을 파일로 저장 (테스트용 기록 파일 생성)"""
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in source.iter_records():
+                if limit is not None and count >= limit:
+                    break
+                f.write(json.dumps({
+                    'record_number': record['record_number'],
+                    'time': record['time'].strftime(EVENT_TIME_FORMAT),
+                    'event_id': record['event_id']
+                }) + '\n')
+                count += 1
+        return count
+
+def get_event_source():
+    """현재 환경의 이벤트 원본 반환 (없으면 None)"""
+    source_file = os.environ.get('PC_EVENT_SOURCE_FILE')
+    if source_file:
+        return FileEventSource(source_file)
+    if os.name == 'nt':
+        return WindowsEventSource()
+    return None
+
+def load_watermarks(watermark_file=WATERMARK_FILE):
+    """PC별 마지막 동기화 위치 로드"""
+    try:
+        if os.path.exists(watermark_file):
+            with open(watermark_file, encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+    except Exception:
+        return {}
+
+def save_watermarks(watermarks, watermark_file=WATERMARK_FILE):
+    """PC별 마지막 동기화 위치 저장"""
+    tmp_file = f"{watermark_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(watermarks, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, watermark_file)
+
+def event_key(event):
+    """중복 판별 키 (PC, 이벤트 ID, 시각)"""
+    time_value = event['time']
+    if isinstance(time_value, datetime):
+        time_value = time_value.strftime(EVENT_TIME_FORMAT)
+    return (event['computer'], int(event['event_id']), time_value)
+
+def to_pc_event(record, computer_name):
+    """이벤트 원본 레코드를 PC 이벤트로 변환"""
+    event_id = record['event_id']
+    return {
+        'time': record['time'],
+        'type': '시작' if event_id in START_EVENT_IDS else '종료',
+        'event_id': event_id,
+        'computer': computer_name
+    }
+
+def select_new_events(records, computer_name, watermark=None, known_keys=None, start_dt=None):
+    """마지막 동기화 이후의 새 이벤트와 갱신된 동기화 위치 반환
+
+    records는 최신 기록부터 정렬되어 있어야 하며, 동기화 위치(또는 start_dt)에 도달하면 읽기를 멈춘다.
+    이벤트 로그가 초기화되어 레코드 번호가 작아진 경우에도 시각이 더 늦으면 새 이벤트로 본다.
+    """
+    last_number = watermark.get('record_number', -1) if watermark else -1
+    last_time = datetime.strptime(watermark['time'], EVENT_TIME_FORMAT) if watermark else datetime.min
+    seen = set(known_keys or ())
+    new_events = []
+    new_watermark = watermark
+
+    for record in records:
+        event_time = record['time']
+        if record['record_number'] <= last_number and event_time <= last_time:
+            break
+        if start_dt is not None and event_time < start_dt:
+            break
+        if new_watermark is watermark:
+            new_watermark = {'record_number': record['record_number'], 'time': event_time.strftime(EVENT_TIME_FORMAT)}
+
+        if record['event_id'] not in TRACKED_EVENT_IDS:
+            continue
+
+        event = to_pc_event(record, computer_name)
+        key = event_key(event)
+        if key in seen:
+            continue
+        seen.add(key)
+        new_events.append(event)
+
+    new_events.reverse()  # 시간순으로 저장
+    return new_events, new_watermark
+
+def append_events_to_sheet(events):
+    """이벤트를 PC_Events 시트 끝에 추가 (실패 시 예외 발생)"""
+    service = get_sheets_client().service
+    SHEET_NAME = 'PC_Events'  # 새로운 시트
+    
+    values = [[
+        event['time'].strftime(EVENT_TIME_FORMAT) if isinstance(event['time'], datetime) else event['time'],
+        event['type'],
+        event['event_id'],
+        event['computer']
+    ] for event in events]
+    
+    body = {
+        'values': values
+    }
+    
+    service.spreadsheets().values().append(
+        spreadsheetId=SPREADSHEET_ID,
+        range=f'{SHEET_NAME}!A:D',
+        valueInputOption='RAW',
+        insertDataOption='INSERT_ROWS',
+        body=body
+    ).execute()
+
+def sync_pc_events(source, computer_name, sink=append_events_to_sheet, watermark_file=WATERMARK_FILE,
+                   since=None, pending=()):
+    """이벤트 원본의 새 이벤트만 sink(기본: PC_Events 시트 끝에 추가)로 보내고, 보낸 이벤트 반환
+
+    sink가 예외 없이 끝난 뒤에만 동기화 위치를 옮기므로, 실패하면 다음 동기화에서 다시 읽는다.
+    since(datetime)를 주면 처음 동기화할 때 그 이전 기록은 읽지 않는다.
+    pending은 아직 시트에 올라가지 않은 이벤트(수집기의 스풀 등)로, 처음 동기화할 때 중복 확인에 포함한다.
+    """
+    watermarks = load_watermarks(watermark_file)
+    watermark = watermarks.get(computer_name)
+
+    # 처음 동기화하는 PC는 이미 시트에 있는 이벤트와 중복되지 않도록 확인
+    known_keys = None
+    if watermark is None:
+        known_keys = {event_key(event) for event in load_events_from_sheet(computer_name=computer_name)}
+        known_keys.update(event_key(event) for event in pending)
+
+    new_events, new_watermark = select_new_events(
+        source.iter_records(), computer_name, watermark, known_keys,
+        start_dt=since if watermark is None else None
+    )
+
+    if new_events:
+        sink(new_events)
+
+    if new_watermark and new_watermark != watermark:
+        watermarks[computer_name] = new_watermark
+        save_watermarks(watermarks, watermark_file)
+
+    return new_events
+
+EVENT_COLUMNS = ['time', 'type', 'event_id', 'computer']
+
+def parse_date_window(start_date, end_date):
+    """조회 기간('YYYY-MM-DD')을 (시작, 종료) 시각으로 변환 (종료일 다음날 0시까지 포함)"""
+    if not (start_date and end_date):
+        return None, None
+    start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+    end_dt = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+    return start_dt, end_dt
+
+def events_frame_from_values(values):
+    """시트 값 목록을 이벤트 DataFrame으로 변환 (형식이 맞지 않는 행은 제외)"""
+    rows = [row[:4] for row in values if len(row) >= 4]
+    df = pd.DataFrame(rows, columns=EVENT_COLUMNS)
+    df['time'] = pd.to_datetime(df['time'], format=EVENT_TIME_FORMAT, errors='coerce')
+    df['event_id'] = pd.to_numeric(df['event_id'], errors='coerce')
+    df = df.dropna(subset=['time', 'event_id'])
+    return df.astype({'time': 'datetime64[ns]', 'type': str, 'event_id': 'int64', 'computer': str})
+
+def events_frame_to_records(df):
+    """이벤트 DataFrame을 dict 목록으로 변환"""
+    return [
+        {'time': time.to_pydatetime(), 'type': event_type, 'event_id': int(event_id), 'computer': computer}
+        for time, event_type, event_id, computer in zip(df['time'], df['type'], df['event_id'], df['computer'])
+    ]
+
+class EventIndex:
+    """(PC, 시각) 순으로 정렬된 이벤트 색인
+
+    PC별 구간과 시각 구간을 모두 이진 탐색으로 찾는다.
+    """
+
+    def __init__(self, df):
+        df = df.sort_values(['computer', 'time'], kind='stable').reset_index(drop=True)
+        self.df = df
+        self._times = df['time'].to_numpy(dtype='datetime64[ns]')
+        computers = df['computer'].to_numpy(dtype=str)
+        names, starts = np.unique(computers, return_index=True)
+        ends = np.append(starts[1:], len(df))
+        self._bounds = dict(zip(names.tolist(), zip(starts.tolist(), ends.tolist())))
+
+    @property
+    def computers(self):
+        return list(self._bounds)
+
+    def _slice_time(self, lo, hi, start_dt, end_dt):
+        times = self._times[lo:hi]
+        if start_dt is not None:
+            lo += int(np.searchsorted(times, np.datetime64(start_dt, 'ns'), side='left'))
+        if end_dt is not None:
+            hi = lo + int(np.searchsorted(self._times[lo:hi], np.datetime64(end_dt, 'ns'), side='right'))
+        return lo, hi
+
+    def query(self, start_dt=None, end_dt=None, computer_name=None):
+        """기간(종료 시각 포함)과 PC로 이벤트 조회"""
+        if computer_name:
+            bounds = [self._bounds[computer_name]] if computer_name in self._bounds else []
+        else:
+            bounds = self._bounds.values()
+
+        positions = []
+        for lo, hi in bounds:
+            lo, hi = self._slice_time(lo, hi, start_dt, end_dt)
+            if lo < hi:
+                positions.append(np.arange(lo, hi))
+
+        if not positions:
+            return self.df.iloc[0:0]
+        return self.df.iloc[np.concatenate(positions)]
+
+def load_events_from_sheet(start_date=None, end_date=None, computer_name=None):
+    """Google Sheets에서 이벤트 로드 (실패 시 예외 발생)"""
+    service = get_sheets_client().service
+    SHEET_NAME = 'PC_Events'
+    
+    result = service.spreadsheets().values().get(
+        spreadsheetId=SPREADSHEET_ID,
+        range=f'{SHEET_NAME}!A:D'
+    ).execute()
+    
+    values = result.get('values', [])
+    start_dt, end_dt = parse_date_window(start_date, end_date)
+    events = EventIndex(events_frame_from_values(values)).query(start_dt, end_dt, computer_name)
+    
+    return events_frame_to_records(events)
+
+EVENT_STORE_FILE = os.path.join(DATA_DIR, 'pc_events.db')
+EVENT_STORE_REFRESH_SECONDS = int(os.environ.get('EVENT_STORE_REFRESH_SECONDS', 300))
+
+def fetch_sheet_event_rows(start_row=1):
+    """PC_Events 시트의 start_row 행부터 끝까지 읽기"""
+    service = get_sheets_client().service
+    SHEET_NAME = 'PC_Events'
+    
+    result = service.spreadsheets().values().get(
+        spreadsheetId=SPREADSHEET_ID,
+        range=f'{SHEET_NAME}!A{start_row}:D'
+    ).execute()
+    return result.get('values', [])
+
+class EventStore:
+    """PC_Events 시트의 로컬 SQLite 캐시
+
+    시트에서 이미 읽은 행 수를 기억해 두고 그 뒤에 추가된 행만 가져오며,
+    기간/PC 조회는 (computer, time) 색인으로 로컬에서 처리한다.
+    """
+
+    def __init__(self, path=EVENT_STORE_FILE, refresh_seconds=EVENT_STORE_REFRESH_SECONDS,
+                 fetch_rows=fetch_sheet_event_rows):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.fetch_rows = fetch_rows
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS events (
+                    computer TEXT NOT NULL,
+                    time TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    event_id INTEGER NOT NULL,
+                    UNIQUE (computer, event_id, time)
+                );
+                CREATE INDEX IF NOT EXISTS idx_events_computer_time ON events (computer, time);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                CREATE TABLE IF NOT EXISTS week_versions (
+                    computer TEXT NOT NULL,
+                    week_start TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    PRIMARY KEY (computer, week_start)
+                ) WITHOUT ROWID;
+                -- 새 이벤트가 들어온 주(월요일 기준)의 버전 올리기
+                -- 자정을 넘긴 세션은 전날/다음날에도 영향을 주므로 그 날이 속한 주도 함께 올림
+                CREATE TRIGGER IF NOT EXISTS events_touch_weeks AFTER INSERT ON events
+                BEGIN
+                    INSERT INTO week_versions (computer, week_start, version)
+                    SELECT DISTINCT NEW.computer, date(NEW.time, shift, '-6 days', 'weekday 1'), 1
+                    FROM (SELECT '-1 day' AS shift UNION ALL SELECT '+0 days' UNION ALL SELECT '+1 day')
+                    WHERE 1
+                    ON CONFLICT (computer, week_start) DO UPDATE SET version = version + 1;
+                END;
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_meta(self, key, default=None):
+        with self._connect() as conn:
+            row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def data_version(self, computer_name):
+        """PC의 이벤트 버전 (새 이벤트가 저장될 때마다 커짐)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT COALESCE(SUM(version), 0) FROM week_versions WHERE computer = ?', (computer_name,)
+            ).fetchone()
+        return row[0]
+
+    def week_versions(self, computer_name, first_week, last_week):
+        """PC의 주별 이벤트 버전 (월요일 'YYYY-MM-DD' -> 버전, 이벤트가 없던 주는 빠짐)"""
+        with self._connect() as conn:
+            return dict(conn.execute(
+                'SELECT week_start, version FROM week_versions '
+                'WHERE computer = ? AND week_start BETWEEN ? AND ?',
+                (computer_name, first_week, last_week)
+            ).fetchall())
+
+    def _set_meta(self, conn, key, value):
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+    def add_events(self, df, conn=None):
+        """이벤트 DataFrame 저장 (이미 있는 이벤트는 무시), 새로 저장된 개수 반환"""
+        if df.empty:
+            return 0
+        rows = list(zip(
+            df['computer'],
+            df['time'].dt.strftime(EVENT_TIME_FORMAT),
+            df['type'],
+            df['event_id'].astype(int).tolist()
+        ))
+        if conn is None:
+            with self._connect() as conn:
+                return self.add_events(df, conn)
+        # rowcount는 트리거(week_versions)가 바꾼 행을 세지 않는다
+        cursor = conn.executemany(
+            'INSERT OR IGNORE INTO events (computer, time, type, event_id) VALUES (?, ?, ?, ?)',
+            rows
+        )
+        return cursor.rowcount
+
+    def needs_refresh(self):
+        # 실패한 시도도 주기에 포함 (시트에 접속할 수 없을 때 rerun마다 다시 기다리지 않도록)
+        last_attempt = float(self.get_meta('last_attempt', 0))
+        return time.time() - last_attempt >= self.refresh_seconds
+
+    def refresh(self, force=False):
+        """시트에 새로 추가된 행만 읽어 저장, 새로 저장된 개수 반환"""
+        if not force and not self.needs_refresh():
+            return 0
+        with self._lock:
+            if not force and not self.needs_refresh():
+                return 0
+            sheet_rows = int(self.get_meta('sheet_rows', 0))
+            with self._connect() as conn:
+                self._set_meta(conn, 'last_attempt', time.time())
+            values = self.fetch_rows(sheet_rows + 1)
+            with self._connect() as conn:
+                added = self.add_events(events_frame_from_values(values), conn)
+                self._set_meta(conn, 'sheet_rows', sheet_rows + len(values))
+                self._set_meta(conn, 'last_refresh', time.time())
+            return added
+
+    def query(self, start_dt=None, end_dt=None, computer_name=None, computers=None):
+        """기간(종료 시각 포함)과 PC(computer_name 하나 또는 computers 목록)로 이벤트 조회"""
+        conditions = []
+        params = []
+        if computer_name:
+            conditions.append('computer = ?')
+            params.append(computer_name)
+        if computers is not None:
+            conditions.append(f"computer IN ({', '.join('?' * len(computers))})")
+            params += list(computers)
+        if start_dt is not None:
+            conditions.append('time >= ?')
+            params.append(start_dt.strftime(EVENT_TIME_FORMAT))
+        if end_dt is not None:
+            conditions.append('time <= ?')
+            params.append(end_dt.strftime(EVENT_TIME_FORMAT))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT time, type, event_id, computer FROM events {where} ORDER BY computer, time',
+                params
+            ).fetchall()
+        return events_frame_from_values(rows)
+
+    def computers(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute('SELECT DISTINCT computer FROM events ORDER BY computer')]
+
+@lru_cache(maxsize=None)
+def get_event_store():
+    """세션 간 공유되는 로컬 이벤트 저장소"""
+    return EventStore()
+
+WORK_POLICY_FILE = os.path.join(DATA_DIR, 'work_policy.json')
+DEFAULT_WORK_POLICY = {
+    # 근무시간에서 제외할 휴게시간 (시작, 종료)
+    'break_windows': [['12:00', '13:00']],
+    # 공휴일 인정 근무시간 (분)
+    'holiday_credit_minutes': 480,
+    # 자체 휴가 설명에 keyword가 들어 있으면 적용 (위에서부터 처음 맞는 규칙)
+    # credit_minutes: 인정 근무시간(분, null이면 공란), count_work: 실제 근무시간도 더할지 여부
+    'leave_rules': [
+        {'keyword': '반차', 'credit_minutes': 240, 'count_work': True},
+    ],
+    # 규칙에 맞지 않는 자체 휴가
+    'default_leave_rule': {'credit_minutes': None, 'count_work': False},
+}
+
+def parse_minutes(time_str):
+    """'HH:MM'을 0시 기준 분으로 변환"""
+    hours, minutes = map(int, time_str.split(':'))
+    return hours * 60 + minutes
+
+class WorkPolicy:
+    """근무시간 계산 규칙 (휴게시간, 공휴일/휴가 인정 시간)
+
+    모든 계산은 분 단위 정수로 하며 배열 전체에 한 번에 적용할 수 있다.
+    """
+
+    def __init__(self, policy=None):
+        policy = {**DEFAULT_WORK_POLICY, **(policy or {})}
+        self.break_windows = [
+            (parse_minutes(start), parse_minutes(end)) for start, end in policy['break_windows']
+        ]
+        self.holiday_credit_minutes = policy['holiday_credit_minutes']
+        self.leave_rules = pd.DataFrame(
+            policy['leave_rules'], columns=['keyword', 'credit_minutes', 'count_work']
+        )
+        self.default_leave_rule = {**DEFAULT_WORK_POLICY['default_leave_rule'], **policy['default_leave_rule']}
+
+    def work_minutes(self, start_minutes, end_minutes):
+        """근무 구간(0시 기준 분)에서 휴게시간과 겹치는 부분을 뺀 근무시간(분), 음수 방지"""
+        start_minutes = np.asarray(start_minutes, dtype=np.int64)
+        end_minutes = np.asarray(end_minutes, dtype=np.int64)
+        total = end_minutes - start_minutes
+        for break_start, break_end in self.break_windows:
+            overlap = np.minimum(end_minutes, break_end) - np.maximum(start_minutes, break_start)
+            total = total - np.maximum(overlap, 0)
+        return np.maximum(total, 0)
+
+    def leave_credit(self, descriptions):
+        """자체 휴가 설명 배열 -> (인정 시간 Int64 Series, 실제 근무시간 포함 여부 배열)"""
+        descriptions = pd.Series(descriptions, dtype=str).reset_index(drop=True)
+        credit = pd.Series(self.default_leave_rule['credit_minutes'], index=descriptions.index, dtype='Int64')
+        count_work = np.full(len(descriptions), bool(self.default_leave_rule['count_work']))
+        matched = np.zeros(len(descriptions), dtype=bool)
+        for rule in self.leave_rules.itertuples(index=False):
+            hit = descriptions.str.contains(rule.keyword, regex=False).to_numpy() & ~matched
+            credit[hit] = pd.NA if pd.isna(rule.credit_minutes) else int(rule.credit_minutes)
+            count_work[hit] = bool(rule.count_work)
+            matched |= hit
+        return credit, count_work
+
+def load_work_policy(policy_file=WORK_POLICY_FILE):
+    """근무 규칙 로드 (파일이 없으면 기본 규칙)"""
+    try:
+        if os.path.exists(policy_file):
+            with open(policy_file, encoding='utf-8') as f:
+                return WorkPolicy(json.load(f))
+    except Exception as e:
+        logger.warning("근무 규칙 파일 오류, 기본 규칙을 사용합니다: %s", e)
+    return WorkPolicy()
+
+@lru_cache(maxsize=4)
+def _get_work_policy(file_stamp):
+    return load_work_policy()
+
+def work_policy_stamp():
+    """근무 규칙 파일의 (수정 시각, 크기), 파일이 없으면 None"""
+    try:
+        stat = os.stat(WORK_POLICY_FILE)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+def get_work_policy():
+    """근무 규칙 반환 (규칙 파일이 바뀐 경우에만 다시 읽음)"""
+    return _get_work_policy(work_policy_stamp())
+
+def calculate_work_minutes(start_time, end_time, date, employee=''):
+    """근무시간(분)과 비고 계산 (근무시간이 없으면 None)"""
+    policy = get_work_policy()
+    calendar = get_holiday_calendar()
+    
+    worked = None
+    if start_time and end_time:
+        start_minute = start_time.hour * 60 + start_time.minute
+        end_minute = start_minute + int((end_time - start_time).total_seconds() // 60)
+        worked = int(policy.work_minutes(start_minute, end_minute))
+    
+    # 공휴일/자체 휴가 체크
+    description = calendar.get_custom_name(date, employee)
+    if description is not None:
+        credit, count_work = policy.leave_credit([description])
+        credit = None if pd.isna(credit[0]) else int(credit[0])
+        if count_work[0] and worked is not None:
+            return worked + (credit or 0), description
+        return credit, description  # 규칙에 없는 자체 휴가는 근무시간 공란, 설명 표시
+    if calendar.is_holiday(date):
+        return policy.holiday_credit_minutes, calendar.get_name(date)
+    
+    # 주말 체크
+    if date.weekday() >= 5:  # 5: 토요일, 6: 일요일
+        return None, "주말"
+    
+    return worked, ""
+
+def calculate_work_hours(start_time, end_time, date, employee=''):
+    """근무시간 계산 (휴게시간 제외), 화면 표시용 HH:MM 문자열 반환"""
+    minutes, note = calculate_work_minutes(start_time, end_time, date, employee)
+    if minutes is None:
+        if get_holiday_calendar().is_custom(date, employee):
+            return "", note
+        return "-", note
+    return f"{minutes // 60:02d}:{minutes % 60:02d}", note
+
+def get_date_range(start_date, end_date):
+    """시작일부터 종료일까지의 평일 목록 반환 (토/일 제외)"""
+    date_list = []
+    current = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    
+    while current <= end:
+        # 평일만 추가 (weekday: 0=월요일, 5=토요일, 6=일요일)
+        if current.weekday() < 5:
+            date_list.append(current.strftime('%Y-%m-%d'))
+        current += timedelta(days=1)
+    
+    return date_list
+
+@lru_cache(maxsize=None)
+def get_week_of_monday(monday_ordinal):
+    """월요일 날짜 서수 -> (주차, 기간) 반환
+
+    월/연도가 바뀌는 주는 금요일이 속한 달 기준으로 센다.
+    """
+    monday = datetime.fromordinal(monday_ordinal)
+    friday = monday + timedelta(days=4)
+    
+    # 연도와 월이 바뀌는 경우 처리
+    if monday.month != friday.month:
+        if monday.year != friday.year:
+            week_key = f"{friday.strftime('%Y-%m')} 1주차"
+        else:
+            first_day_of_month = friday.replace(day=1)
+            first_monday = first_day_of_month - timedelta(days=first_day_of_month.weekday())
+            week_num = ((friday - first_monday).days // 7) + 1
+            week_key = f"{friday.strftime('%Y-%m')} {week_num}주차"
+    else:
+        first_day_of_month = monday.replace(day=1)
+        first_monday = first_day_of_month - timedelta(days=first_day_of_month.weekday())
+        week_num = ((monday - first_monday).days // 7) + 1
+        week_key = f"{monday.strftime('%Y-%m')} {week_num}주차"
+    
+    return week_key, f"{monday.strftime('%Y-%m-%d')} ~ {friday.strftime('%Y-%m-%d')}"
+
+def get_week_labels(dates):
+    """날짜 배열의 (주차, 기간) 배열 반환 (주 단위로 한 번씩만 계산)"""
+    ordinals = to_ordinals(pd.to_datetime(pd.Series(dates)))
+    mondays = ordinals - (ordinals - 1) % 7  # 서수 1(0001-01-01)은 월요일
+    unique_mondays, inverse = np.unique(mondays, return_inverse=True)
+    labels = [get_week_of_monday(int(monday)) for monday in unique_mondays]
+    week_keys = np.array([label[0] for label in labels], dtype=object)
+    periods = np.array([label[1] for label in labels], dtype=object)
+    return week_keys[inverse], periods[inverse]
+
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+DAILY_RECORD_COLUMNS = ['PC', '날짜', 'PC 시작', 'PC 종료', '근무시간', '비고', '근무분']
+
+def to_ordinals(dates):
+    """날짜 배열을 날짜 서수(date.toordinal) 배열로 변환"""
+    days = np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+    return days + EPOCH_ORDINAL
+
+def format_minutes(minutes):
+    """분 단위 값(Series)을 HH:MM 문자열로 변환 (값이 없으면 빈 문자열)"""
+    minutes = pd.Series(minutes, dtype='Int64')
+    text = (
+        (minutes // 60).astype(str).str.zfill(2) + ':' +
+        (minutes % 60).astype(str).str.zfill(2)
+    )
+    return text.where(minutes.notna(), '').astype(str)
+
+BOOT_GAP = pd.Timedelta(minutes=5)  # 이 간격 안에 연달아 기록된 시작 이벤트는 같은 부팅으로 본다
+CRASH_EVENT_ID = 6008  # 직전 종료가 비정상이었음을 부팅 시 기록하는 이벤트
+SESSION_COLUMNS = ['computer', 'start', 'end', 'crashed']
+
+def sessionize_events(events_df):
+    """이벤트를 PC별 사용 세션(시작~종료)으로 묶기
+
+    (PC, 시각) 순으로 한 번 정렬한 뒤 선형으로 처리한다.
+    - 종료 뒤에 오는 시작(또는 직전 시작과 BOOT_GAP 이상 떨어진 시작)에서 새 세션이 열린다.
+    - 세션의 종료 시각은 세션 안의 마지막 종료 이벤트(1074/6006) 시각이다.
+    - 종료 없이 다음 세션이 열리면 비정상 종료(crashed)로 보고 종료 시각은 비워 둔다.
+      6008은 다음 부팅 때 기록되므로 종료로 쓰지 않는다.
+    - 조회 기간 앞에서 시작된 세션의 종료만 있는 경우 시작 시각을 비워 둔다.
+    """
+    events_df = events_df[events_df['event_id'] != CRASH_EVENT_ID]
+    events_df = events_df.sort_values(['computer', 'time'], kind='stable')
+    if events_df.empty:
+        return pd.DataFrame({
+            'computer': pd.Series(dtype=str),
+            'start': pd.Series(dtype='datetime64[ns]'),
+            'end': pd.Series(dtype='datetime64[ns]'),
+            'crashed': pd.Series(dtype=bool),
+        })
+
+    computers = events_df['computer'].to_numpy(dtype=str)
+    times = events_df['time'].to_numpy(dtype='datetime64[ns]')
+    is_start = (events_df['type'] == '시작').to_numpy()
+
+    first_of_computer = np.ones(len(times), dtype=bool)
+    first_of_computer[1:] = computers[1:] != computers[:-1]
+    prev_is_start = np.zeros(len(times), dtype=bool)
+    prev_is_start[1:] = is_start[:-1]
+    gap = np.zeros(len(times), dtype='timedelta64[ns]')
+    gap[1:] = times[1:] - times[:-1]
+
+    new_session = first_of_computer | (is_start & (~prev_is_start | (gap > BOOT_GAP.to_timedelta64())))
+    bounds = np.flatnonzero(new_session)
+
+    not_a_time = np.datetime64('NaT', 'ns')
+    starts = np.where(is_start[bounds], times[bounds], not_a_time)
+    stop_values = np.where(is_start, np.iinfo(np.int64).min, times.view(np.int64))
+    ends = np.maximum.reduceat(stop_values, bounds)
+    ends = np.where(ends == np.iinfo(np.int64).min, not_a_time, ends.view('datetime64[ns]'))
+
+    session_computers = computers[bounds]
+    last_of_computer = np.ones(len(bounds), dtype=bool)
+    last_of_computer[:-1] = session_computers[1:] != session_computers[:-1]
+    crashed = np.isnat(ends) & ~np.isnat(starts) & ~last_of_computer
+
+    return pd.DataFrame({
+        'computer': session_computers,
+        'start': starts,
+        'end': ends,
+        'crashed': crashed,
+    })[SESSION_COLUMNS]
+
+def split_sessions_by_day(sessions):
+    """종료된 세션을 자정 기준으로 나누어 날짜별 조각으로 변환
+
+    반환 컬럼: computer, day, start_minute, end_minute (날짜 0시 기준 분, 종료는 최대 1440),
+    first_piece/last_piece (조각의 시작/종료가 자정에서 나눈 경계가 아니라 세션의 실제 시작/종료인지)
+    """
+    closed = sessions.dropna(subset=['start', 'end'])
+    closed = closed[closed['end'] >= closed['start']]
+    start = closed['start'].to_numpy(dtype='datetime64[ns]').astype('datetime64[m]')
+    end = closed['end'].to_numpy(dtype='datetime64[ns]').astype('datetime64[m]')
+    start_day = start.astype('datetime64[D]')
+    end_day = end.astype('datetime64[D]')
+
+    day_count = (end_day - start_day).astype(np.int64) + 1
+    index = np.repeat(np.arange(len(closed)), day_count)
+    offset = np.arange(len(index)) - np.repeat(np.cumsum(day_count) - day_count, day_count)
+    day = start_day[index] + offset.astype('timedelta64[D]')
+    day_start = day.astype('datetime64[m]')
+
+    piece_start = np.maximum(start[index], day_start)
+    piece_end = np.minimum(end[index], day_start + np.timedelta64(1, 'D'))
+    return pd.DataFrame({
+        'computer': closed['computer'].to_numpy(dtype=str)[index],
+        'day': day.astype('datetime64[ns]'),
+        'start_minute': (piece_start - day_start).astype(np.int64),
+        'end_minute': (piece_end - day_start).astype(np.int64),
+        'first_piece': offset == 0,
+        'last_piece': offset == day_count[index] - 1,
+    })
+
+def build_daily_records(events_df, start_date, end_date, computers=None, employees=None):
+    """PC별 평일 기록 계산
+
+    이벤트를 세션으로 묶고 자정 기준으로 나눈 뒤, 날짜별 첫 시작/마지막 종료 시각(그날의 실제 이벤트만)과
+    세션별 근무시간(분, 근무 규칙의 휴게시간 제외)의 합계, 공휴일/자체 휴가 표시를
+    PC와 날짜 전체에 대해 한 번에 계산한다.
+    employees(PC명 -> 직원명)가 주어지면 해당 직원의 개인 휴가도 반영한다.
+    """
+    events_df = events_df.assign(time=pd.to_datetime(events_df['time']))
+    if computers is None:
+        computers = sorted(events_df['computer'].unique())
+    workdays = pd.to_datetime(get_date_range(start_date, end_date))
+    grid = pd.MultiIndex.from_product([list(computers), workdays], names=['PC', 'day'])
+
+    sessions = sessionize_events(events_df)
+    pieces = split_sessions_by_day(sessions)
+
+    # 세션 조각별 근무시간 (휴게시간과 겹치는 부분 제외)
+    policy = get_work_policy()
+    pieces['work_minute'] = policy.work_minutes(pieces['start_minute'], pieces['end_minute'])
+
+    # 시각 표시는 실제 시작/종료 이벤트로만 (자정을 넘긴 세션의 0시/24시 경계는 비워 둠)
+    shown = pieces.assign(
+        start_minute=pieces['start_minute'].where(pieces['first_piece']),
+        end_minute=pieces['end_minute'].where(pieces['last_piece']),
+    )
+
+    # 종료가 없는 시작, 시작이 없는 종료도 시각 표시에는 포함
+    def minutes_of(times):
+        times = pd.Series(times.to_numpy(dtype='datetime64[ns]'))
+        day = times.dt.normalize()
+        return day, (times - day) // pd.Timedelta(minutes=1)
+
+    unmatched_start = sessions[sessions['end'].isna() & sessions['start'].notna()]
+    start_day, start_minute = minutes_of(unmatched_start['start'])
+    unmatched_stop = sessions[sessions['start'].isna() & sessions['end'].notna()]
+    stop_day, stop_minute = minutes_of(unmatched_stop['end'])
+    crashed_day, _ = minutes_of(sessions.loc[sessions['crashed'], 'start'])
+
+    marks = pd.concat([
+        shown,
+        pd.DataFrame({'computer': unmatched_start['computer'].to_numpy(dtype=str), 'day': start_day, 'start_minute': start_minute}),
+        pd.DataFrame({'computer': unmatched_stop['computer'].to_numpy(dtype=str), 'day': stop_day, 'end_minute': stop_minute}),
+    ], ignore_index=True)
+    grouped = marks.groupby(['computer', 'day'])
+    daily = pd.DataFrame({
+        'start_minute': grouped['start_minute'].min(),
+        'end_minute': grouped['end_minute'].max(),
+        'work_minute': grouped['work_minute'].sum(min_count=1),
+    }).reindex(grid)
+    start_minutes = daily['start_minute'].astype('Int64').reset_index(drop=True)
+    stop_minutes = daily['end_minute'].astype('Int64').reset_index(drop=True)
+    work_minutes = daily['work_minute'].astype('Int64').reset_index(drop=True)
+
+    crashed_keys = pd.MultiIndex.from_arrays(
+        [sessions.loc[sessions['crashed'], 'computer'].to_numpy(dtype=str), crashed_day]
+    )
+    crashed = grid.isin(crashed_keys)
+
+    # 자정을 넘겨 이어지는 세션이 있는 날 (시작/종료 시각이 그날 안에 없음을 비고로 표시)
+    def days_of(mask):
+        return pd.MultiIndex.from_arrays([pieces.loc[mask, 'computer'], pieces.loc[mask, 'day']])
+    carried_in = grid.isin(days_of(~pieces['first_piece']))
+    carried_out = grid.isin(days_of(~pieces['last_piece']))
+
+    # 공휴일/자체 휴가
+    calendar = get_holiday_calendar()
+    calendar.ensure_years(workdays.year.unique())
+    ordinals = to_ordinals(grid.get_level_values('day'))
+    row_employees = grid.get_level_values('PC').map(dict(employees or {})).fillna('')
+    holiday = calendar.contains(ordinals)
+    custom, leave_names = calendar.leave(row_employees, ordinals)
+    notes = np.full(len(grid), '', dtype=object)
+    notes[carried_in] = '전날부터 이어짐'
+    notes[carried_out] = '다음날까지 이어짐'
+    notes[carried_in & carried_out] = '전날부터 다음날까지 이어짐'
+    notes[crashed] = '비정상 종료'
+    notes[holiday] = calendar.names(ordinals[holiday])
+    notes[custom] = leave_names[custom]
+
+    # 공휴일은 인정 시간으로, 자체 휴가는 휴가 규칙에 따라 계산
+    public = holiday & ~custom
+    work_minutes[public] = policy.holiday_credit_minutes
+    start_minutes[public] = pd.NA
+    stop_minutes[public] = pd.NA
+
+    custom_rows = np.flatnonzero(custom)
+    credit, count_work = policy.leave_credit(notes[custom_rows])
+    worked = work_minutes.iloc[custom_rows].reset_index(drop=True)
+    leave_minutes = credit.where(~pd.Series(count_work), worked.fillna(0) + credit.fillna(0))
+    leave_minutes = leave_minutes.where(~(pd.Series(count_work) & worked.isna() & credit.isna()))
+    work_minutes.iloc[custom_rows] = leave_minutes.to_numpy()
+    start_minutes.iloc[custom_rows[~count_work]] = pd.NA
+    stop_minutes.iloc[custom_rows[~count_work]] = pd.NA
+
+    daily = pd.DataFrame({
+        'PC': grid.get_level_values('PC').astype(str),
+        '날짜': grid.get_level_values('day').strftime('%Y-%m-%d'),
+        'PC 시작': format_minutes(start_minutes).to_numpy(),
+        'PC 종료': format_minutes(stop_minutes).to_numpy(),
+        '근무시간': format_minutes(work_minutes).to_numpy(),
+        '비고': notes.astype(str),
+        '근무분': work_minutes.array,
+    })
+    return daily[DAILY_RECORD_COLUMNS]
+
+def calculate_weekly_stats(daily_records, by=None):
+    """주차별 통계 계산 (by: PC 등 함께 묶을 컬럼 목록)"""
+    by = list(by or [])
+    records = daily_records[daily_records['근무분'].notna()]
+    if records.empty:
+        return []
+
+    week_keys, periods = get_week_labels(records['날짜'])
+    records = records.assign(
+        주차=week_keys,
+        기간=periods,
+        근무분=records['근무분'].astype('int64')
+    )
+    weekly = records.groupby(by + ['주차'], sort=False).agg(
+        기간=('기간', 'first'),
+        총근무분=('근무분', 'sum'),
+        근무일수=('근무분', 'size')
+    ).reset_index()
+    weekly['평균 근무시간'] = format_minutes((weekly['총근무분'] / weekly['근무일수']).astype(int))
+    weekly['총 근무시간'] = format_minutes(weekly['총근무분'])
+    weekly['근무일수'] = weekly['근무일수'].astype(int)
+    weekly = weekly.sort_values(by + ['주차'], ascending=[True] * len(by) + [False])
+
+    return weekly[by + ['주차', '기간', '평균 근무시간', '총 근무시간', '근무일수']].to_dict('records')
+
+def build_attendance_report(events_df, start_date, end_date, computers=None, employees=None):
+    """PC별 일자 기록과 주차별 통계를 함께 계산 (daily, weekly DataFrame 반환)"""
+    daily = build_daily_records(events_df, start_date, end_date, computers, employees)
+    weekly = pd.DataFrame(
+        calculate_weekly_stats(daily, by=['PC']),
+        columns=['PC', '주차', '기간', '평균 근무시간', '총 근무시간', '근무일수']
+    )
+    return daily, weekly
+
+class AttendanceAggregates:
+    """직원/PC별 주간·월간 근무 집계 (이벤트 저장소와 같은 SQLite 파일에 보관)
+
+    한 주를 월 경계에서 나눈 (주, 월) 조각마다 총 근무분과 근무일수를 저장해 두고,
+    주간 통계는 주 단위로, 월간 통계는 월 단위로 합산해 읽는다.
+    주마다 계산에 사용한 이벤트 버전, 공휴일/휴가 목록, 근무 규칙을 함께 기록해
+    셋 중 하나라도 바뀐 주만 다시 계산한다.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        with store._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS work_aggregates (
+                    computer TEXT NOT NULL,
+                    employee TEXT NOT NULL,
+                    week_start TEXT NOT NULL,
+                    month TEXT NOT NULL,
+                    total_minutes INTEGER NOT NULL,
+                    workdays INTEGER NOT NULL,
+                    PRIMARY KEY (computer, employee, week_start, month)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS aggregate_weeks (
+                    computer TEXT NOT NULL,
+                    employee TEXT NOT NULL,
+                    week_start TEXT NOT NULL,
+                    event_version INTEGER NOT NULL,
+                    holiday_key TEXT NOT NULL,
+                    policy_key TEXT NOT NULL,
+                    computed_through TEXT NOT NULL,
+                    PRIMARY KEY (computer, employee, week_start)
+                ) WITHOUT ROWID;
+            """)
+
+    @staticmethod
+    def _mondays(start_date, end_date):
+        """기간과 겹치는 주의 월요일 날짜 서수 배열"""
+        first = datetime.strptime(start_date, '%Y-%m-%d').toordinal()
+        last = datetime.strptime(end_date, '%Y-%m-%d').toordinal()
+        first -= (first - 1) % 7  # 서수 1(0001-01-01)은 월요일
+        return np.arange(first, last + 1, 7, dtype=np.int64)
+
+    def _holiday_keys(self, mondays, employee):
+        """주별 공휴일/휴가 목록 문자열 (바뀌면 그 주를 다시 계산)"""
+        calendar = get_holiday_calendar()
+        ordinals = (mondays[:, None] + np.arange(5)).ravel()
+        names = np.full(len(ordinals), '', dtype=object)
+        holiday = calendar.contains(ordinals)
+        names[holiday] = calendar.names(ordinals[holiday])
+        leave, leave_names = calendar.leave(np.full(len(ordinals), employee, dtype=object), ordinals)
+        names[leave] = leave_names[leave]
+        return ['|'.join(week) for week in names.astype(str).reshape(-1, 5)]
+
+    def ensure(self, computer_name, employee, start_date, end_date):
+        """기간과 겹치는 주 중 바뀐 주만 다시 집계, 다시 계산한 주 수 반환"""
+        with self._lock:
+            mondays = self._mondays(start_date, end_date)
+            if not len(mondays):
+                return 0
+            get_holiday_calendar().ensure_years(
+                range(datetime.fromordinal(int(mondays[0])).year,
+                      datetime.fromordinal(int(mondays[-1]) + 4).year + 1)
+            )
+            week_starts = [datetime.fromordinal(int(monday)).strftime('%Y-%m-%d') for monday in mondays]
+            # 오늘 기록은 아직 끝나지 않았으므로 어제까지만 집계
+            last_day = datetime.now().toordinal() - 1
+            throughs = [
+                datetime.fromordinal(int(min(monday + 4, last_day))).strftime('%Y-%m-%d')
+                for monday in mondays
+            ]
+            versions = self.store.week_versions(computer_name, week_starts[0], week_starts[-1])
+            holiday_keys = self._holiday_keys(mondays, employee)
+            policy_key = str(work_policy_stamp())
+
+            with self.store._connect() as conn:
+                computed = {
+                    row[0]: row[1:] for row in conn.execute(
+                        'SELECT week_start, event_version, holiday_key, policy_key, computed_through '
+                        'FROM aggregate_weeks WHERE computer = ? AND employee = ? AND week_start BETWEEN ? AND ?',
+                        (computer_name, employee, week_starts[0], week_starts[-1])
+                    )
+                }
+            states = [
+                (versions.get(week_start, 0), holiday_key, policy_key, through)
+                for week_start, holiday_key, through in zip(week_starts, holiday_keys, throughs)
+            ]
+            stale = [
+                i for i, (week_start, state) in enumerate(zip(week_starts, states))
+                if week_start <= throughs[i] and computed.get(week_start) != state
+            ]
+            if not stale:
+                return 0
+
+            # 다시 계산할 첫 주~마지막 주를 한 번에 계산 (자정을 넘긴 세션을 위해 하루 전부터 조회)
+            first, last = stale[0], stale[-1]
+            span_start, span_end = week_starts[first], throughs[last]
+            start_dt, end_dt = parse_date_window(span_start, span_end)
+            events_df = self.store.query(start_dt - timedelta(days=1), end_dt, computer_name)[EVENT_COLUMNS]
+            daily = build_daily_records(
+                events_df, span_start, span_end, [computer_name], {computer_name: employee}
+            )
+            daily = daily[daily['근무분'].notna()]
+            ordinals = to_ordinals(pd.to_datetime(daily['날짜']))
+            mondays_of_day = ordinals - (ordinals - 1) % 7
+            pieces = pd.DataFrame({
+                'week_start': [datetime.fromordinal(int(monday)).strftime('%Y-%m-%d') for monday in mondays_of_day],
+                'month': daily['날짜'].str[:7].to_numpy(),
+                'minutes': daily['근무분'].astype('int64').to_numpy(),
+            }).groupby(['week_start', 'month'])['minutes'].agg(['sum', 'size']).reset_index()
+
+            recomputed = range(first, last + 1)
+            with self.store._connect() as conn:
+                conn.execute(
+                    'DELETE FROM work_aggregates WHERE computer = ? AND employee = ? AND week_start BETWEEN ? AND ?',
+                    (computer_name, employee, week_starts[first], week_starts[last])
+                )
+                conn.executemany(
+                    'INSERT INTO work_aggregates (computer, employee, week_start, month, total_minutes, workdays) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    [(computer_name, employee, week_start, month, int(total), int(days))
+                     for week_start, month, total, days in pieces.itertuples(index=False)]
+                )
+                conn.executemany(
+                    'INSERT OR REPLACE INTO aggregate_weeks '
+                    '(computer, employee, week_start, event_version, holiday_key, policy_key, computed_through) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    [(computer_name, employee, week_starts[i], *states[i]) for i in recomputed
+                     if week_starts[i] <= throughs[i]]
+                )
+            return len(recomputed)
+
+    def weekly(self, computer_name, employee, start_date, end_date):
+        """기간의 주차별 통계 (calculate_weekly_stats와 같은 형식, 최근 주부터)
+
+        기간 안에 온전히 들어가는 주는 저장된 집계에서 읽고, 기간이 주 중간에서 시작하거나 끝나는
+        첫 주와 마지막 주는 기간 안의 날짜만 일자별 기록으로 계산한다.
+        """
+        self.ensure(computer_name, employee, start_date, end_date)
+        mondays = self._mondays(start_date, end_date)
+        if not len(mondays):
+            return []
+        first = datetime.strptime(start_date, '%Y-%m-%d').toordinal()
+        last = datetime.strptime(end_date, '%Y-%m-%d').toordinal()
+        partial = [int(monday) for monday in {mondays[0], mondays[-1]} if monday < first or monday + 4 > last]
+        full = [int(monday) for monday in mondays if monday not in partial]
+
+        stats = []
+        if full:
+            with self.store._connect() as conn:
+                rows = conn.execute(
+                    'SELECT week_start, SUM(total_minutes), SUM(workdays) FROM work_aggregates '
+                    'WHERE computer = ? AND employee = ? AND week_start BETWEEN ? AND ? '
+                    'GROUP BY week_start HAVING SUM(workdays) > 0',
+                    (computer_name, employee,
+                     datetime.fromordinal(full[0]).strftime('%Y-%m-%d'),
+                     datetime.fromordinal(full[-1]).strftime('%Y-%m-%d'))
+                ).fetchall()
+            for week_start, total, days in rows:
+                week_key, period = get_week_of_monday(datetime.strptime(week_start, '%Y-%m-%d').toordinal())
+                stats.append({
+                    '주차': week_key,
+                    '기간': period,
+                    '평균 근무시간': f"{total // days // 60:02d}:{total // days % 60:02d}",
+                    '총 근무시간': f"{total // 60:02d}:{total % 60:02d}",
+                    '근무일수': days,
+                })
+
+        for monday in partial:
+            span_start = datetime.fromordinal(max(monday, first)).strftime('%Y-%m-%d')
+            span_end = datetime.fromordinal(min(monday + 4, last)).strftime('%Y-%m-%d')
+            if span_start > span_end:  # 기간이 주말에만 걸친 주
+                continue
+            start_dt, end_dt = parse_date_window(span_start, span_end)
+            events_df = self.store.query(start_dt - timedelta(days=1), end_dt, computer_name)[EVENT_COLUMNS]
+            daily = build_daily_records(
+                events_df, span_start, span_end, [computer_name], {computer_name: employee}
+            )
+            stats.extend(calculate_weekly_stats(daily))
+
+        stats.sort(key=lambda week: week['주차'], reverse=True)
+        return stats
+
+    def monthly(self, computer_name, employee, start_month, end_month):
+        """월별 통계 ('YYYY-MM' 범위, 최근 달부터)"""
+        end_day = (datetime.strptime(end_month, '%Y-%m') + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+        self.ensure(computer_name, employee, f"{start_month}-01", end_day.strftime('%Y-%m-%d'))
+        with self.store._connect() as conn:
+            rows = conn.execute(
+                'SELECT month, SUM(total_minutes), SUM(workdays) FROM work_aggregates '
+                'WHERE computer = ? AND employee = ? AND month BETWEEN ? AND ? '
+                'GROUP BY month HAVING SUM(workdays) > 0 ORDER BY month DESC',
+                (computer_name, employee, start_month, end_month)
+            ).fetchall()
+        return [
+            {
+                '월': month,
+                '평균 근무시간': f"{total // days // 60:02d}:{total // days % 60:02d}",
+                '총 근무시간': f"{total // 60:02d}:{total % 60:02d}",
+                '근무일수': days,
+            }
+            for month, total, days in rows
+        ]
+
+@lru_cache(maxsize=None)
+def get_attendance_aggregates():
+    """세션 간 공유되는 주간/월간 집계"""
+    return AttendanceAggregates(get_event_store())
+
+def get_data_version(computer_name):
+    """캐시 키로 쓰는 (이벤트, 공휴일/휴가, 근무 규칙, 날짜) 버전
+
+    집계는 어제까지만 하므로 날짜가 바뀌어도 다시 계산한다.
+    """
+    return (
+        get_event_store().data_version(computer_name),
+        get_holiday_store().version(),
+        work_policy_stamp(),
+        datetime.now().strftime('%Y-%m-%d'),
+    )
+
+def get_leave_key(employee):
+    """계산/캐시에 쓰는 직원명
+
+    개인 휴가가 없는 직원의 기록은 공통 휴무만 반영한 결과와 같으므로 ''로 묶어,
+    직원명만 바뀐 경우 캐시된 결과와 저장된 주간 집계를 그대로 쓴다.
+    """
+    return employee if get_holiday_calendar().has_leave(employee) else ''
+
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), 'attendance_exports')
+EXPORT_COMPUTERS_PER_CHUNK = 100  # 한 번에 계산할 PC 수
+EXPORT_WEEKS_PER_CHUNK = 13  # 한 번에 계산할 주 수 (주 단위로 나눠야 주차별 통계가 잘리지 않음)
+EXPORT_KEEP_SECONDS = 3600  # 끝난 내보내기 작업과 파일을 보관하는 시간
+EXPORT_FORMATS = {'CSV': 'csv', 'Excel': 'xlsx', 'Parquet': 'parquet'}
+EXPORT_DAILY_COLUMNS = ['직원명', 'PC', '날짜', 'PC 시작', 'PC 종료', '근무시간', '비고', '근무분']
+EXPORT_WEEKLY_COLUMNS = ['직원명', 'PC', '주차', '기간', '평균 근무시간', '총 근무시간', '근무일수']
+
+def iter_export_windows(start_date, end_date, weeks=EXPORT_WEEKS_PER_CHUNK):
+    """기간을 월요일 기준 weeks주 단위 구간 [(시작일, 종료일)]으로 나누기"""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    window_start = start
+    while window_start <= end:
+        monday = window_start - timedelta(days=window_start.weekday())
+        window_end = min(monday + timedelta(weeks=weeks, days=-1), end)
+        yield window_start.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')
+        window_start = window_end + timedelta(days=1)
+
+def iter_report_chunks(start_date, end_date, computers, employees=None,
+                       computers_per_chunk=EXPORT_COMPUTERS_PER_CHUNK):
+    """(PC 묶음 x 주 구간)마다 (daily, weekly) DataFrame 생성
+
+    한 번에 PC 묶음 하나, 몇 주치 이벤트만 읽으므로 전체 기간/전체 직원이어도 메모리 사용이 일정하다.
+    """
+    store = get_event_store()
+    employees = dict(employees or {})
+    for i in range(0, len(computers), computers_per_chunk):
+        chunk = list(computers[i:i + computers_per_chunk])
+        for window_start, window_end in iter_export_windows(start_date, end_date):
+            start_dt, end_dt = parse_date_window(window_start, window_end)
+            events_df = store.query(start_dt - timedelta(days=1), end_dt, computers=chunk)[EVENT_COLUMNS]
+            daily, weekly = build_attendance_report(events_df, window_start, window_end, chunk, employees)
+            daily.insert(0, '직원명', daily['PC'].map(employees).fillna(''))
+            weekly.insert(0, '직원명', weekly['PC'].map(employees).fillna(''))
+            yield daily[EXPORT_DAILY_COLUMNS], weekly[EXPORT_WEEKLY_COLUMNS]
+
+class ExportWriter:
+    """일자별/주차별 기록을 조각 단위로 이어 쓰는 파일 작성기
+
+    CSV/Parquet은 표마다 파일 하나씩 쓴 뒤 zip으로 묶고, Excel은 시트 두 개짜리 파일 하나로 쓴다.
+    """
+
+    def __init__(self, fmt, path):
+        if fmt == 'xlsx' and Workbook is None:
+            raise RuntimeError("Excel 내보내기에는 openpyxl 패키지가 필요합니다.")
+        if fmt == 'parquet' and pq is None:
+            raise RuntimeError("Parquet 내보내기에는 pyarrow 패키지가 필요합니다.")
+        self.fmt = fmt
+        self.path = path
+        self._parts = {}
+        if fmt == 'xlsx':
+            self._workbook = Workbook(write_only=True)  # 행을 바로 임시 파일로 흘려 씀
+            self._sheets = {}
+
+    def write(self, name, df):
+        if self.fmt == 'xlsx':
+            sheet = self._sheets.get(name)
+            if sheet is None:
+                sheet = self._sheets[name] = self._workbook.create_sheet(name)
+                sheet.append(list(df.columns))
+            for row in df.astype(object).where(df.notna(), None).itertuples(index=False):
+                sheet.append(list(row))
+        elif self.fmt == 'parquet':
+            # 조각마다 스키마가 같아야 하므로 정수 컬럼 외에는 문자열로 고정
+            df = df.astype({
+                column: 'Int64' if column in ('근무분', '근무일수') else 'string' for column in df.columns
+            })
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if name not in self._parts:
+                self._parts[name] = (f"{self.path}.{name}.parquet", pq.ParquetWriter(f"{self.path}.{name}.parquet", table.schema))
+            self._parts[name][1].write_table(table)
+        else:
+            if name not in self._parts:
+                self._parts[name] = (f"{self.path}.{name}.csv", None)
+                df.to_csv(self._parts[name][0], index=False, encoding='utf-8-sig')
+            else:
+                df.to_csv(self._parts[name][0], mode='a', header=False, index=False, encoding='utf-8-sig')
+
+    def close(self):
+        """파일 마무리, 내려받을 파일 경로 반환"""
+        if self.fmt == 'xlsx':
+            self._workbook.save(self.path)
+            return self.path
+        with zipfile.ZipFile(self.path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, (part_path, writer) in self._parts.items():
+                if writer is not None:
+                    writer.close()
+                archive.write(part_path, f"{name}.{self.fmt}")
+                os.remove(part_path)
+        return self.path
+
+class ExportJob:
+    """백그라운드 내보내기 작업 상태"""
+
+    def __init__(self, fmt, start_date, end_date):
+        self.id = uuid.uuid4().hex
+        self.fmt = fmt
+        self.start_date = start_date
+        self.end_date = end_date
+        self.status = 'queued'  # queued -> running -> done / failed
+        self.progress = 0.0
+        self.rows = 0
+        self.path = None
+        self.error = None
+        self.finished_at = None  # 끝난(done/failed) 시각, 보관 기간 계산용
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    @property
+    def file_name(self):
+        ext = 'xlsx' if self.fmt == 'xlsx' else 'zip'
+        return f"출퇴근기록_{self.start_date}_{self.end_date}.{ext}"
+
+def export_attendance(job, computers, employees=None, export_dir=EXPORT_DIR):
+    """출퇴근 기록을 조각 단위로 계산해 파일로 쓰기 (작업 스레드에서 실행)"""
+    job.status = 'running'
+    try:
+        os.makedirs(export_dir, exist_ok=True)
+        path = os.path.join(export_dir, f"{job.id}.{'xlsx' if job.fmt == 'xlsx' else 'zip'}")
+        writer = ExportWriter(job.fmt, path)
+        chunk_count = (
+            -(-len(computers) // EXPORT_COMPUTERS_PER_CHUNK) *
+            len(list(iter_export_windows(job.start_date, job.end_date)))
+        )
+        for done, (daily, weekly) in enumerate(
+                iter_report_chunks(job.start_date, job.end_date, computers, employees), start=1):
+            writer.write('일자별', daily)
+            writer.write('주차별', weekly)
+            job.rows += len(daily)
+            job.progress = done / max(chunk_count, 1)
+        job.path = writer.close()
+        job.progress = 1.0
+        job.finished_at = time.time()
+        job.status = 'done'
+    except Exception as e:
+        job.error = str(e)
+        job.finished_at = time.time()
+        job.status = 'failed'
+    return job
+
+def expire_export_jobs(jobs, export_dir=EXPORT_DIR, keep_seconds=EXPORT_KEEP_SECONDS):
+    """끝난 지 keep_seconds가 지난 작업을 목록에서 빼고, 진행 중이 아닌 오래된 내보내기 파일 지우기
+
+    이전에 실행된 앱이 남긴 파일도 수정 시각 기준으로 함께 지운다.
+    """
+    now = time.time()
+    for job_id, job in list(jobs.items()):
+        if job.finished_at is not None and now - job.finished_at >= keep_seconds:
+            jobs.pop(job_id, None)
+    if not os.path.isdir(export_dir):
+        return
+    for name in os.listdir(export_dir):
+        if name.split('.', 1)[0] in jobs:  # 작업 ID로 시작하는 파일 (작성 중인 조각 포함)
+            continue
+        path = os.path.join(export_dir, name)
+        try:
+            if now - os.path.getmtime(path) >= keep_seconds:
+                os.remove(path)
+        except OSError:
+            pass
+
+def get_computer_info():
+    """PC 정보 반환"""
+    try:
+        return platform.node()  # 실제 PC 장치명 반환
+    except:
+        return "알 수 없음"
+
+def plan_upsert(existing_values, values, key_columns=(0, 3)):
+    """(직원명, 날짜) 기준으로 수정할 행과 새로 추가할 행 구분
+
+    existing_values는 데이터 시작 행부터 읽은 시트 값이며,
+    반환값은 ([(기존 행 위치, 새 값)], [추가할 값]) 이다.
+    """
+    width = max((len(row) for row in values), default=0)
+    row_index = {}
+    existing_rows = []
+    for position, row in enumerate(existing_values):
+        row = [str(value) for value in row] + [''] * (width - len(row))
+        existing_rows.append(row[:width])
+        key = tuple(row[column] for column in key_columns)
+        row_index.setdefault(key, position)  # 중복 행은 위쪽(최근 입력) 기준
+
+    updates = []
+    inserts = []
+    planned = set()
+    for row in values:
+        row_str = ['' if value is None else str(value) for value in row]
+        key = tuple(row_str[column] for column in key_columns)
+        if key in planned:
+            continue
+        planned.add(key)
+        position = row_index.get(key)
+        if position is None:
+            inserts.append(row)
+        elif existing_rows[position] != row_str:
+            updates.append((position, row))
+    return updates, inserts
+
+def update_google_sheet(records, employee_name, mode='upsert'):
+    """구글 시트 업데이트 함수 수정
+
+    mode='upsert'는 (직원명, 날짜)가 같은 행을 갱신하고 새 날짜만 추가하며,
+    mode='insert'는 모든 행을 새로 추가한다.
+    """
+    try:
+        # 공용 구글 시트 클라이언트 사용
+        client = get_sheets_client()
+        service = client.service
+        
+        # 시트 범위 지정
+        SHEET_NAME = '출퇴근관리'
+        START_ROW = 5  # 데이터 시작 행
+        
+        # 데이터 포맷팅
+        values = []
+        computer_name = get_computer_info()
+        
+        # 각 레코드의 주차 정보 계산
+        week_keys, _ = get_week_labels([record.get('날짜', '') for record in records])
+        for record, week_info in zip(records, week_keys):
+            date = record.get('날짜', '')
+            
+            values.append([
+                employee_name,          # 직원명
+                computer_name,          # PC 정보
+                week_info,              # 주차 정보
+                date,                   # 날짜
+                record.get('PC 시작', ''),  # PC 시작
+                record.get('PC 종료', ''),  # PC 종종료
+                record.get('근무시간', ''),  # 근무시간
+                record.get('비고', '')   # 비고
+            ])
+        
+        # 시트 ID (캐시됨)
+        sheet_id = client.get_sheet_id(SHEET_NAME)
+        
+        if sheet_id is None:
+            return False, "지정된 시트를 찾을 수 없습니다."
+        
+        if not values:
+            return True, "입력할 데이터가 없습니다."
+        
+        if mode != 'upsert':
+            # 행 삽입과 데이터 입력을 한 번의 batchUpdate로 처리 (많으면 나누어 호출)
+            execute_batch_update(service, insert_rows_requests(sheet_id, START_ROW - 1, values))
+            return True, f"{len(values)}개의 데이터가 구글 시트에 입력되었습니다."
+        
+        # 기존 데이터를 한 번 읽어 (직원명, 날짜) -> 행 위치 매핑
+        result = service.spreadsheets().values().get(
+            spreadsheetId=SPREADSHEET_ID,
+            range=f'{SHEET_NAME}!A{START_ROW}:H'
+        ).execute()
+        updates, inserts = plan_upsert(result.get('values', []), values)
+        
+        if not updates and not inserts:
+            return True, "변경된 데이터가 없습니다."
+        
+        # 기존 행 수정 후 새 행 삽입 (요청 순서대로 적용되므로 수정 위치는 삽입 전 기준)
+        requests = [
+            (update_cells_request(sheet_id, START_ROW - 1 + position, [row]), 1)
+            for position, row in updates
+        ]
+        if inserts:
+            requests += insert_rows_requests(sheet_id, START_ROW - 1, inserts)
+        execute_batch_update(service, requests)
+        
+        return True, f"구글 시트에 {len(updates)}개의 데이터를 수정하고 {len(inserts)}개의 데이터를 추가했습니다."
+        
+    except Exception as e:
+        return False, f"구글 시트 업데이트 중 오류 발생: {str(e)}"
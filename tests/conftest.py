@@ -0,0 +1,24 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'On-Off-check'))
+sys.path.insert(0, str(ROOT / '원고검수'))
+
+# 출퇴근엔진은 불러올 때 저장소 위치를 정하므로, 앱 폴더 대신 임시 폴더를 쓰도록 먼저 지정
+os.environ['ATTENDANCE_DATA_DIR'] = tempfile.mkdtemp(prefix='attendance_test_')
+
+@pytest.fixture
+def local_sheet(tmp_path, monkeypatch):
+    """Google Sheets 대신 tmp_path의 JSON 시트를 쓰도록 설정, 시트 파일 경로 반환"""
+    import 출퇴근엔진
+
+    path = tmp_path / 'sheets.json'
+    monkeypatch.setenv('SHEETS_LOCAL_FILE', str(path))
+    출퇴근엔진.get_sheets_client.cache_clear()
+    yield path
+    출퇴근엔진.get_sheets_client.cache_clear()
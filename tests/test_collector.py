@@ -0,0 +1,79 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from PC이벤트수집기 import collect_once, flush_spool, read_spool
+from 출퇴근엔진 import FileEventSource, append_events_to_sheet, load_watermarks
+
+def write_log(path, rows):
+    """(기록 번호, 시각, 이벤트 ID) 목록을 최신 기록부터 이벤트 로그 파일로 저장"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for number, time, event_id in sorted(rows, reverse=True):
+            f.write(json.dumps({'record_number': number, 'time': time, 'event_id': event_id}) + '\n')
+
+def sheet_rows(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['sheets']['PC_Events']['rows']
+
+LOG = [
+    (1, '2025-03-03 09:00:00', 6005),
+    (2, '2025-03-03 12:00:00', 7036),  # 추적하지 않는 이벤트
+    (3, '2025-03-03 18:00:00', 6006),
+]
+
+def test_collect_once_spools_new_events_and_moves_watermark(tmp_path, local_sheet):
+    log, spool, watermark = tmp_path / 'log.jsonl', tmp_path / 'spool.jsonl', tmp_path / 'watermark.json'
+    write_log(log, LOG)
+
+    assert collect_once(FileEventSource(log), 'PC1', spool, watermark) == 2
+    assert [event['event_id'] for event in read_spool(spool)] == [6005, 6006]
+    assert load_watermarks(watermark) == {'PC1': {'record_number': 3, 'time': '2025-03-03 18:00:00'}}
+
+    # 새 기록이 없으면 아무것도 추가하지 않음
+    assert collect_once(FileEventSource(log), 'PC1', spool, watermark) == 0
+    assert len(read_spool(spool)) == 2
+
+    write_log(log, LOG + [(4, '2025-03-04 09:00:00', 6005)])
+    assert collect_once(FileEventSource(log), 'PC1', spool, watermark) == 1
+    assert [event['time'] for event in read_spool(spool)][-1] == '2025-03-04 09:00:00'
+    assert load_watermarks(watermark)['PC1']['record_number'] == 4
+
+def test_first_collect_skips_events_already_in_sheet_or_spool(tmp_path, local_sheet):
+    log, spool, watermark = tmp_path / 'log.jsonl', tmp_path / 'spool.jsonl', tmp_path / 'watermark.json'
+    write_log(log, LOG + [(4, '2025-03-04 09:00:00', 6005)])
+    append_events_to_sheet([
+        {'time': datetime(2025, 3, 3, 9), 'type': '시작', 'event_id': 6005, 'computer': 'PC1'},
+    ])
+    with open(spool, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'time': '2025-03-03 18:00:00', 'type': '종료', 'event_id': 6006, 'computer': 'PC1'}) + '\n')
+
+    assert collect_once(FileEventSource(log), 'PC1', spool, watermark) == 1
+    assert [event['time'] for event in read_spool(spool)] == ['2025-03-03 18:00:00', '2025-03-04 09:00:00']
+
+def test_failed_spool_write_keeps_watermark(tmp_path, local_sheet):
+    log, watermark = tmp_path / 'log.jsonl', tmp_path / 'watermark.json'
+    write_log(log, LOG)
+    spool = tmp_path / 'missing' / 'spool.jsonl'  # 폴더가 없어 쓰기 실패
+
+    with pytest.raises(OSError):
+        collect_once(FileEventSource(log), 'PC1', spool, watermark)
+    assert load_watermarks(watermark) == {}
+
+def test_collect_and_flush_uploads_each_event_once(tmp_path, local_sheet):
+    log, spool, watermark = tmp_path / 'log.jsonl', tmp_path / 'spool.jsonl', tmp_path / 'watermark.json'
+    write_log(log, LOG)
+
+    collect_once(FileEventSource(log), 'PC1', spool, watermark)
+    assert flush_spool(spool) == 2
+    collect_once(FileEventSource(log), 'PC1', spool, watermark)
+    assert flush_spool(spool) == 0
+
+    # 수집 위치 파일을 잃어도 시트에 있는 이벤트는 다시 올리지 않음
+    watermark.unlink()
+    collect_once(FileEventSource(log), 'PC1', spool, watermark)
+    assert flush_spool(spool) == 0
+    assert [row[:3] for row in sheet_rows(local_sheet)] == [
+        ['2025-03-03 09:00:00', '시작', 6005],
+        ['2025-03-03 18:00:00', '종료', 6006],
+    ]
@@ -0,0 +1,60 @@
+import pandas as pd
+
+from 출퇴근엔진 import EVENT_COLUMNS, build_daily_records, sessionize_events
+
+EVENTS = pd.DataFrame([
+    ['2025-03-10 08:55:00', '시작', 6005, 'A'],
+    ['2025-03-10 08:56:00', '시작', 6009, 'A'],   # 같은 부팅
+    ['2025-03-10 12:10:00', '종료', 1074, 'A'],
+    ['2025-03-10 12:10:20', '종료', 6006, 'A'],
+    ['2025-03-10 12:12:00', '시작', 6005, 'A'],   # 점심 재부팅
+    ['2025-03-10 18:05:00', '종료', 6006, 'A'],
+    ['2025-03-11 09:00:00', '시작', 6005, 'A'],   # 종료 기록 없이 꺼짐
+    ['2025-03-12 09:10:00', '시작', 6009, 'A'],
+    ['2025-03-12 09:10:20', '종료', 6008, 'A'],   # 전날 비정상 종료 기록 (종료로 쓰지 않음)
+    ['2025-03-12 22:00:00', '종료', 6006, 'A'],
+    ['2025-03-13 21:00:00', '시작', 6005, 'A'],
+    ['2025-03-14 02:00:00', '종료', 6006, 'A'],   # 자정을 넘긴 세션
+    ['2025-03-10 09:30:00', '시작', 6005, 'B'],
+    ['2025-03-10 17:30:00', '종료', 6006, 'B'],
+], columns=EVENT_COLUMNS)
+
+def test_sessionize_events():
+    sessions = sessionize_events(EVENTS.assign(time=pd.to_datetime(EVENTS['time'])))
+    a = sessions[sessions['computer'] == 'A']
+    assert a['start'].dt.strftime('%m-%d %H:%M').tolist() == [
+        '03-10 08:55', '03-10 12:12', '03-11 09:00', '03-12 09:10', '03-13 21:00'
+    ]
+    assert a['end'].dt.strftime('%m-%d %H:%M').fillna('').tolist() == [
+        '03-10 12:10', '03-10 18:05', '', '03-12 22:00', '03-14 02:00'
+    ]
+    assert a['crashed'].tolist() == [False, False, True, False, False]
+    assert len(sessions[sessions['computer'] == 'B']) == 1
+
+def test_session_before_query_window_has_no_start():
+    events = EVENTS[EVENTS['time'] >= '2025-03-14'].assign(time=lambda df: pd.to_datetime(df['time']))
+    sessions = sessionize_events(events)
+    assert sessions['start'].isna().tolist() == [True]
+    assert sessions['crashed'].tolist() == [False]
+
+def test_build_daily_records():
+    daily = build_daily_records(EVENTS, '2025-03-10', '2025-03-14', ['A', 'B'])
+    a = daily[daily['PC'] == 'A'].set_index('날짜')
+    assert a['PC 시작'].tolist() == ['08:55', '09:00', '09:10', '21:00', '']
+    assert a['PC 종료'].tolist() == ['18:05', '', '22:00', '', '02:00']
+    # 휴게시간(12:00~13:00)은 세션별로 뺀다
+    assert a.loc['2025-03-10', '근무분'] == 490
+    assert pd.isna(a.loc['2025-03-11', '근무분'])
+    assert a.loc['2025-03-11', '비고'] == '비정상 종료'
+    assert a.loc['2025-03-12', '근무분'] == 710
+    assert (a.loc['2025-03-13', '근무분'], a.loc['2025-03-13', '비고']) == (180, '다음날까지 이어짐')
+    assert (a.loc['2025-03-14', '근무분'], a.loc['2025-03-14', '비고']) == (120, '전날부터 이어짐')
+
+    b = daily[daily['PC'] == 'B'].set_index('날짜')
+    assert b.loc['2025-03-10', '근무시간'] == '07:00'
+    assert b['근무분'].isna().tolist() == [False, True, True, True, True]
+
+def test_build_daily_records_marks_public_holidays():
+    events = pd.DataFrame(columns=EVENT_COLUMNS)
+    daily = build_daily_records(events, '2025-06-05', '2025-06-06', ['A'])
+    assert daily['비고'].tolist() == ['', '현충일']
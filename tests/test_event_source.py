@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from 출퇴근엔진 import FileEventSource
+
+ROWS = [
+    {'record_number': number, 'time': f'2025-03-{1 + number // 10:02d} 09:{number % 60:02d}:00', 'event_id': 6005}
+    for number in range(1, 301)
+]
+
+def write_rows(path, rows, end='\n'):
+    path.write_text('\n'.join(json.dumps(row) for row in rows) + end, encoding='utf-8')
+
+@pytest.mark.parametrize('newest_first', [True, False])
+@pytest.mark.parametrize('block_size', [7, 100, FileEventSource.BLOCK_SIZE])
+def test_records_come_newest_first_in_either_file_order(tmp_path, newest_first, block_size, monkeypatch):
+    path = tmp_path / 'log.jsonl'
+    write_rows(path, ROWS[::-1] if newest_first else ROWS)
+    monkeypatch.setattr(FileEventSource, 'BLOCK_SIZE', block_size)
+    numbers = [record['record_number'] for record in FileEventSource(path).iter_records()]
+    assert numbers == list(range(300, 0, -1))
+
+def test_missing_final_newline_and_blank_lines(tmp_path):
+    path = tmp_path / 'log.jsonl'
+    write_rows(path, ROWS, end='')
+    assert next(FileEventSource(path).iter_records())['record_number'] == 300
+    write_rows(path, ROWS[::-1], end='\n\n')
+    assert len(list(FileEventSource(path).iter_records())) == 300
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'log.jsonl'
+    path.write_text('', encoding='utf-8')
+    assert list(FileEventSource(path).iter_records()) == []
+
+def test_appended_log_reads_only_the_tail_when_stopped_early(tmp_path, monkeypatch):
+    path = tmp_path / 'log.jsonl'
+    write_rows(path, ROWS)
+    monkeypatch.setattr(FileEventSource, 'BLOCK_SIZE', 256)
+    parsed = []
+    parse = FileEventSource._parse
+    monkeypatch.setattr(FileEventSource, '_parse', staticmethod(lambda line: parsed.append(line) or parse(line)))
+
+    records = FileEventSource(path).iter_records()
+    assert [next(records)['record_number'] for _ in range(3)] == [300, 299, 298]
+    assert len(parsed) == 5  # 순서 확인용 첫 줄/마지막 줄 + 읽은 3건
+
+def test_record_round_trip(tmp_path):
+    source_path, copy_path = tmp_path / 'log.jsonl', tmp_path / 'copy.jsonl'
+    write_rows(source_path, ROWS)
+    assert FileEventSource.record(FileEventSource(source_path), copy_path, limit=10) == 10
+    assert [record['record_number'] for record in FileEventSource(copy_path).iter_records()] == list(range(300, 290, -1))
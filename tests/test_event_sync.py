@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from 출퇴근엔진 import select_new_events
+
+def record(number, time, event_id=6005):
+    return {'record_number': number, 'time': datetime.strptime(time, '%Y-%m-%d %H:%M:%S'), 'event_id': event_id}
+
+# 최신 기록부터
+RECORDS = [
+    record(4, '2025-03-04 09:00:00'),
+    record(3, '2025-03-03 18:00:00', 6006),
+    record(2, '2025-03-03 12:00:00', 7036),
+    record(1, '2025-03-03 09:00:00'),
+]
+
+def test_first_sync_returns_tracked_events_in_time_order():
+    events, watermark = select_new_events(iter(RECORDS), 'PC1')
+    assert [(event['time'], event['type']) for event in events] == [
+        (datetime(2025, 3, 3, 9), '시작'),
+        (datetime(2025, 3, 3, 18), '종료'),
+        (datetime(2025, 3, 4, 9), '시작'),
+    ]
+    assert watermark == {'record_number': 4, 'time': '2025-03-04 09:00:00'}
+
+def test_sync_stops_at_watermark_without_reading_older_records():
+    read = []
+
+    def records():
+        for item in RECORDS:
+            read.append(item['record_number'])
+            yield item
+
+    events, watermark = select_new_events(records(), 'PC1', {'record_number': 3, 'time': '2025-03-03 18:00:00'})
+    assert [event['time'] for event in events] == [datetime(2025, 3, 4, 9)]
+    assert watermark['record_number'] == 4
+    assert read == [4, 3]
+
+def test_nothing_new_keeps_watermark():
+    watermark = {'record_number': 4, 'time': '2025-03-04 09:00:00'}
+    assert select_new_events(iter(RECORDS), 'PC1', watermark) == ([], watermark)
+
+def test_cleared_log_with_later_events_is_still_new():
+    # 이벤트 로그를 지워 레코드 번호가 다시 1부터 시작
+    watermark = {'record_number': 4, 'time': '2025-03-04 09:00:00'}
+    events, new_watermark = select_new_events(iter([record(1, '2025-03-05 09:00:00')]), 'PC1', watermark)
+    assert [event['time'] for event in events] == [datetime(2025, 3, 5, 9)]
+    assert new_watermark == {'record_number': 1, 'time': '2025-03-05 09:00:00'}
+
+def test_known_keys_and_start_dt_limit_first_sync():
+    known = {('PC1', 6006, '2025-03-03 18:00:00')}
+    events, _ = select_new_events(iter(RECORDS), 'PC1', known_keys=known, start_dt=datetime(2025, 3, 3, 10))
+    assert [event['time'] for event in events] == [datetime(2025, 3, 4, 9)]
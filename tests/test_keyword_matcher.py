@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from 검수엔진 import KeywordMatcher, get_keyword_matcher, resolve_matches
+
+def find_with_loop(text, keywords):
+    """KeywordMatcher 이전 방식: 키워드마다 text.find() 반복"""
+    positions = []
+    for keyword in keywords:
+        start = 0
+        while True:
+            index = text.find(keyword, start)
+            if index == -1:
+                break
+            positions.append((index, index + len(keyword), keyword))
+            start = index + 1
+    positions.sort()
+    return positions
+
+@pytest.mark.parametrize('text, keywords', [
+    ('국내 최고의 의사가 있는 병원, 최고 시설', ['최고', '최고의', '의사', '사가']),
+    ('아아아아', ['아', '아아', '아아아']),
+    ('abcabcab', ['abc', 'bca', 'cab', 'c', 'abcabcab']),
+    ('완치 보장', ['완치 보장', '보장', '치 보']),
+    ('', ['최고']),
+    ('키워드 없음', []),
+])
+def test_matches_find_loop(text, keywords):
+    assert KeywordMatcher(keywords).find_all(text) == find_with_loop(text, keywords)
+
+def test_matches_find_loop_on_random_text():
+    rng = random.Random(0)
+    alphabet = '가나다라 '
+    for _ in range(200):
+        keywords = list({''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(8)})
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        assert KeywordMatcher(keywords).find_all(text) == find_with_loop(text, keywords)
+
+def test_duplicate_and_empty_keywords_are_ignored():
+    matcher = KeywordMatcher(['최고', '', '최고'])
+    assert len(matcher) == 1
+    assert matcher.find_all('최고최고') == [(0, 2, '최고'), (2, 4, '최고')]
+
+def test_matcher_is_reused_for_the_same_keyword_list():
+    notes = {'최고': '과장 표현', '완치': '의료법 위반'}
+    assert get_keyword_matcher(notes) is get_keyword_matcher(dict(notes))
+
+def test_resolve_prefers_leftmost_then_longest():
+    text = '국내 최고의 의사가 있는 병원'
+    positions = KeywordMatcher(['최고', '최고의', '의사', '사가']).find_all(text)
+    assert resolve_matches(positions) == [(3, 6, '최고의'), (7, 9, '의사')]
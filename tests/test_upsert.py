@@ -0,0 +1,43 @@
+from 출퇴근엔진 import plan_upsert
+
+def apply(existing, updates, inserts):
+    """plan_upsert 결과를 시트 값에 반영 (update_google_sheet처럼 새 행은 맨 위에 삽입)"""
+    rows = [list(row) for row in existing]
+    for position, row in updates:
+        rows[position] = list(row)
+    return [list(row) for row in inserts] + rows
+
+EXISTING = [
+    ['홍길동', 'PC1', '월', '2025-03-11', '09:00', '18:00', '08:00', ''],
+    ['홍길동', 'PC1', '월', '2025-03-10', '09:00', '18:00', '08:00', ''],
+    ['김철수', 'PC2', '월', '2025-03-10', '08:30', '17:30', '08:00', ''],
+]
+
+def test_unchanged_rows_are_left_alone():
+    assert plan_upsert(EXISTING, [list(row) for row in EXISTING]) == ([], [])
+
+def test_changed_rows_update_in_place_and_new_rows_insert():
+    values = [
+        ['홍길동', 'PC1', '월', '2025-03-10', '09:00', '19:00', '09:00', ''],
+        ['홍길동', 'PC1', '월', '2025-03-12', '09:00', '18:00', '08:00', ''],
+    ]
+    updates, inserts = plan_upsert(EXISTING, values)
+    assert updates == [(1, values[0])]
+    assert inserts == [values[1]]
+
+def test_applying_the_plan_twice_changes_nothing():
+    values = [
+        ['홍길동', 'PC1', '월', '2025-03-10', '09:00', '19:00', '09:00', ''],
+        ['홍길동', 'PC1', '월', '2025-03-12', '09:00', '18:00', 480, None],
+        ['홍길동', 'PC1', '월', '2025-03-12', '10:00', '18:00', 420, None],  # 같은 키는 처음 것만
+    ]
+    sheet = apply(EXISTING, *plan_upsert(EXISTING, values))
+    assert len(sheet) == len(EXISTING) + 1
+    # 시트에서 다시 읽으면 문자열이 되고 빈 칸은 잘려 나옴
+    reread = [[str(value) for value in row if value is not None] for row in sheet]
+    assert plan_upsert(reread, values) == ([], [])
+
+def test_duplicate_sheet_rows_match_the_top_one():
+    existing = [EXISTING[1], list(EXISTING[1])]
+    values = [['홍길동', 'PC1', '월', '2025-03-10', '09:00', '19:00', '09:00', '']]
+    assert plan_upsert(existing, values) == ([(0, values[0])], [])
@@ -0,0 +1,380 @@
+# 원고 검수 공통 엔진
+# 검수 앱(app.py, 원고검수.py, 원고검수_외부공유.py, 원고검수_web_v2.py)이 함께 쓰는 키워드 검색/강조 기능
+import json
+import os
+import threading
+import time
+from copy import deepcopy
+from functools import lru_cache
+
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import RGBColor
+from docx.text.run import Run
+
+KEYWORD_COLOR = RGBColor(251, 65, 65)  # 키워드 (빨간색, 굵게)
+NOTE_COLOR = RGBColor(92, 179, 56)     # 키워드 옆 사유
+
+KEYWORD_SPREADSHEET_KEY = '1eNCbstSMyQAA7CPvwb2qE7kZWg40B7Jf-fJ7ti0ABOE'
+KEYWORD_RANGE = '키워드!B3:C'  # B열 키워드, C열 사유/제안
+KEYWORD_SNAPSHOT_FILE = 'keyword_snapshot.json'
+KEYWORD_CACHE_SECONDS = 300  # 시트 변경 여부를 다시 확인하는 주기
+
+class KeywordRepository:
+    """키워드 시트의 로컬 사본
+
+    키워드를 메모리와 로컬 파일(snapshot_file)에 보관하고, ttl이 지나면 시트의 수정 시각
+    (Drive modifiedTime)만 먼저 확인해 바뀐 경우에만 키워드 범위를 한 번에 다시 읽는다.
+    확인은 백그라운드에서 하므로 검수는 바로 시작되고, 시트에 잠시 접속할 수 없어도
+    마지막으로 읽은 키워드로 계속 동작한다.
+    authorize는 인증된 gspread 클라이언트를 돌려주는 함수 (앱마다 인증 방식이 다름).
+    """
+
+    def __init__(self, authorize, snapshot_file=KEYWORD_SNAPSHOT_FILE, ttl=KEYWORD_CACHE_SECONDS,
+                 spreadsheet_key=KEYWORD_SPREADSHEET_KEY):
+        self._authorize = authorize
+        self.snapshot_file = snapshot_file
+        self.ttl = ttl
+        self.spreadsheet_key = spreadsheet_key
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._spreadsheet = None
+        self.keyword_notes = None
+        self.version = None  # 키워드를 읽을 때의 시트 수정 시각
+        self.checked_at = 0.0
+        self.last_error = None
+        self._load_snapshot()
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_file, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.keyword_notes = dict(snapshot['keywords'])
+            self.version = snapshot.get('version')
+            self.checked_at = snapshot.get('checked_at', 0.0)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save_snapshot(self):
+        temp_file = f"{self.snapshot_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.version,
+                'checked_at': self.checked_at,
+                'keywords': list(self.keyword_notes.items()),
+            }, f, ensure_ascii=False)
+        os.replace(temp_file, self.snapshot_file)
+
+    def _open(self):
+        if self._spreadsheet is None:
+            self._spreadsheet = self._authorize().open_by_key(self.spreadsheet_key)
+        return self._spreadsheet
+
+    def refresh(self, force=False):
+        """시트가 바뀐 경우에만 키워드 다시 읽기, 다시 읽었으면 True"""
+        spreadsheet = self._open()
+        version = spreadsheet.get_lastUpdateTime()
+        if not force and self.keyword_notes is not None and version == self.version:
+            self.checked_at = time.time()
+            return False
+
+        ranges = spreadsheet.values_batch_get([KEYWORD_RANGE])['valueRanges']
+        keyword_notes = {}
+        for row in ranges[0].get('values', []):
+            keyword = row[0] if row else ''
+            if keyword.strip():  # 빈 셀 제외
+                keyword_notes[keyword] = row[1] if len(row) > 1 else ''
+
+        with self._lock:
+            self.keyword_notes = keyword_notes
+            self.version = version
+            self.checked_at = time.time()
+            self._save_snapshot()
+        return True
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # 접속 실패 시 사본을 그대로 쓰고 다음 주기에 다시 시도
+                self.last_error = str(e)
+                self.checked_at = time.time()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def get(self, wait=False):
+        """키워드 -> 사유 딕셔너리
+
+        사본이 없으면 시트에서 읽을 때까지 기다리고(실패하면 예외), 사본이 오래되었으면
+        백그라운드에서 갱신한다. wait=True이면 갱신을 기다리되 실패하면 사본을 쓴다 (일괄 처리용).
+        """
+        if self.keyword_notes is None:
+            self.refresh(force=True)
+        elif wait:
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+        elif time.time() - self.checked_at >= self.ttl:
+            self._refresh_in_background()
+        return self.keyword_notes
+
+class KeywordMatcher:
+    """여러 키워드를 문단 한 번 순회로 모두 찾는 Aho–Corasick 자동기(오토마톤)
+
+    키워드마다 text.find()를 반복하면 키워드 수 x 문단 길이만큼 걸리지만,
+    자동기는 키워드 수와 관계없이 문단 길이 + 찾은 개수만큼만 걸린다.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+        self._goto = [{}]  # 상태별 다음 글자 -> 다음 상태
+        self._fail = [0]   # 상태별 실패 시 이동할 상태 (가장 긴 접미사 상태)
+        self._out = [()]   # 상태에서 끝나는 키워드 번호 (접미사로 끝나는 키워드 포함)
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = next_state
+            self._out[state] = self._out[state] + (index,)
+
+        # 너비 우선으로 실패 링크 연결
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail if fail != next_state else 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def find_all(self, text):
+        """문단의 모든 키워드 위치 [(시작, 끝, 키워드)] (겹치는 위치 포함, 시작 위치 순)"""
+        goto, fail, out, keywords = self._goto, self._fail, self._out, self.keywords
+        positions = []
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                keyword = keywords[index]
+                positions.append((end - len(keyword), end, keyword))
+        positions.sort()
+        return positions
+
+@lru_cache(maxsize=4)
+def _compile_keywords(keywords):
+    return KeywordMatcher(keywords)
+
+def get_keyword_matcher(keyword_notes):
+    """키워드 목록으로 자동기 생성 (같은 키워드 목록이면 만들어 둔 자동기를 재사용)"""
+    return _compile_keywords(tuple(keyword_notes))
+
+PLAIN, KEYWORD, NOTE = 'text', 'keyword', 'note'  # 런 계획의 구간 종류
+
+def resolve_matches(positions):
+    """겹치는 키워드 위치 정리 (가장 왼쪽 우선, 시작이 같으면 가장 긴 키워드 우선)
+
+    예: '최고의'에서 '최고'와 '최고의'가 모두 찾아지면 '최고의' 하나만 남긴다.
+    시작과 길이가 같으면 같은 키워드이므로 이 두 기준만으로 하나로 정해진다.
+    정렬 한 번과 순회 한 번이므로 찾은 개수 m에 대해 O(m log m).
+    """
+    ordered = sorted(positions, key=lambda match: (match[0], match[0] - match[1]))
+    resolved = []
+    last_end = 0
+    for start, end, keyword in ordered:
+        if start >= last_end:
+            resolved.append((start, end, keyword))
+            last_end = end
+    return resolved
+
+def plan_runs(text, matches, keyword_notes):
+    """문단을 [(구간 종류, 글자)] 런 계획으로 나누기
+
+    matches는 겹치지 않아야 한다 (resolve_matches 결과).
+    키워드 뒤에는 사유(NOTE)를 붙이고, 같은 종류의 구간이 붙어 있으면 하나로 합쳐
+    문서에 만들 런 수를 최소로 한다 (예: 사유 없는 키워드 두 개가 붙어 있으면 런 하나).
+    """
+    plan = []
+
+    def add(kind, segment):
+        if not segment:
+            return
+        if plan and plan[-1][0] == kind:
+            plan[-1] = (kind, plan[-1][1] + segment)
+        else:
+            plan.append((kind, segment))
+
+    current_pos = 0
+    for start, end, keyword in matches:
+        add(PLAIN, text[current_pos:start])
+        add(KEYWORD, text[start:end])
+        note = keyword_notes.get(keyword)
+        if note:
+            add(NOTE, f" {note}")
+        current_pos = end
+    add(PLAIN, text[current_pos:])
+    return plan
+
+def _text_length(child):
+    """런 자식 요소가 r.text에서 차지하는 글자 수 (그림, 필드, 기호, 각주 참조 등은 0)"""
+    tag = child.tag
+    if tag == qn('w:t'):
+        return len(child.text or '')
+    if tag == qn('w:br'):
+        return 1 if child.get(qn('w:type'), 'textWrapping') == 'textWrapping' else 0
+    if tag in (qn('w:tab'), qn('w:ptab'), qn('w:cr'), qn('w:noBreakHyphen')):
+        return 1
+    return 0
+
+def _set_text(t, text):
+    """w:t 글자 바꾸기 (앞뒤 공백이 있으면 그대로 유지되도록 표시)"""
+    t.text = text
+    if text != text.strip():
+        t.set(qn('xml:space'), 'preserve')
+
+def _split_run(r, offset):
+    """런을 offset 글자(r.text 기준)에서 둘로 나누기, 뒤쪽 런 반환
+
+    offset이 가운데에 걸린 w:t만 둘로 나누고, 나머지 자식 요소(그림, 필드, 기호, 각주 참조,
+    페이지 나누기 등)는 순서대로 offset 앞에 있으면 앞쪽 런에, 뒤에 있으면 뒤쪽 런에 둔다.
+    서식(w:rPr)은 양쪽에 그대로 둔다.
+    """
+    right = deepcopy(r)
+    left_children = [child for child in r if child.tag != qn('w:rPr')]
+    right_children = [child for child in right if child.tag != qn('w:rPr')]
+
+    cut, inside = len(left_children), None
+    position = 0
+    for index, child in enumerate(left_children):
+        length = _text_length(child)
+        if length and position >= offset:
+            cut = index
+            break
+        if position < offset < position + length:
+            cut, inside = index, offset - position
+            break
+        position += length
+
+    for child in left_children[cut if inside is None else cut + 1:]:
+        r.remove(child)
+    for child in right_children[:cut]:
+        right.remove(child)
+    if inside is not None:
+        text = left_children[cut].text
+        _set_text(left_children[cut], text[:inside])
+        _set_text(right_children[cut], text[inside:])
+    r.addnext(right)
+    return right
+
+def _split_hyperlink_after(r):
+    """링크 안의 런 r 뒤에서 링크를 둘로 나누기 (뒤쪽은 같은 속성의 새 링크), 앞쪽 링크 반환"""
+    hyperlink = r.getparent()
+    rest = list(r.itersiblings())
+    if rest:
+        tail = OxmlElement('w:hyperlink')
+        for name, value in hyperlink.attrib.items():
+            tail.set(name, value)
+        for element in rest:
+            tail.append(element)
+        hyperlink.addnext(tail)
+    return hyperlink
+
+def highlight_paragraph(paragraph, plan):
+    """런 계획을 문단의 기존 런 위에 적용
+
+    키워드 구간의 경계가 런 중간에 있을 때만 그 런을 나누고, 키워드가 걸친 런에만
+    색과 굵게를 더한다. 나머지 런(굵게, 링크, 글꼴 등)은 건드리지 않으며,
+    사유는 키워드 바로 뒤에 키워드 런의 서식을 이어받은 새 런으로 넣는다.
+    키워드가 링크 안에 있으면 링크를 키워드 끝에서 둘로 나누어(같은 주소) 그 사이에 넣고,
+    사유에는 링크 서식(문자 스타일, 밑줄)을 물려주지 않는다.
+    """
+    # 문단 글자 순서대로의 런 (링크 안의 런 포함, paragraph.text와 같은 순서)
+    spans = []
+    position = 0
+    for r in paragraph._p.xpath('./w:r | ./w:hyperlink/w:r'):
+        length = len(r.text)
+        spans.append((position, position + length, r))
+        position += length
+
+    # 키워드 구간과 사유 위치
+    keywords = []
+    notes = []
+    position = 0
+    for kind, segment in plan:
+        if kind == NOTE:
+            notes.append((position, segment))
+            continue
+        if kind == KEYWORD:
+            keywords.append((position, position + len(segment)))
+        position += len(segment)
+
+    # 키워드 경계가 런 중간에 걸리면 그 런만 나누기
+    cuts = sorted({cut for keyword in keywords for cut in keyword})
+    split_spans = []
+    index = 0
+    for start, end, r in spans:
+        while index < len(cuts) and cuts[index] <= start:
+            index += 1
+        while index < len(cuts) and cuts[index] < end:
+            right = _split_run(r, cuts[index] - start)
+            split_spans.append((start, cuts[index], r))
+            start, r = cuts[index], right
+            index += 1
+        split_spans.append((start, end, r))
+
+    # 키워드 구간 안의 런 강조
+    index = 0
+    for start, end in keywords:
+        while index < len(split_spans) and split_spans[index][1] <= start:
+            index += 1
+        while index < len(split_spans) and split_spans[index][1] <= end:
+            run = Run(split_spans[index][2], paragraph)
+            run.font.color.rgb = KEYWORD_COLOR
+            run.bold = True
+            index += 1
+
+    # 사유는 키워드가 끝나는 런 바로 뒤에 삽입
+    # 같은 링크 안에 사유가 여러 개 들어갈 수 있으므로 뒤쪽 사유부터 넣어 순서를 지킴
+    run_ending_at = {end: r for start, end, r in split_spans if end > start}
+    for position, note in reversed(notes):
+        last = run_ending_at[position]
+        anchor = last
+        in_link = last.getparent().tag == qn('w:hyperlink')
+        if in_link:
+            anchor = _split_hyperlink_after(last)
+        note_r = OxmlElement('w:r')
+        if last.rPr is not None:
+            rPr = deepcopy(last.rPr)
+            if in_link:
+                for link_format in rPr.xpath('./w:rStyle | ./w:u'):
+                    rPr.remove(link_format)
+            note_r.append(rPr)
+        anchor.addnext(note_r)
+        note_run = Run(note_r, paragraph)
+        note_run.text = note
+        note_run.bold = False
+        note_run.font.color.rgb = NOTE_COLOR
@@ -0,0 +1,87 @@
+# 키워드 검색 성능 비교: 키워드마다 text.find()를 반복하는 기존 방식 vs Aho–Corasick 자동기(오토마톤)
+# 가상의 금지 표현 목록과 긴 원고를 만들어 두 방식의 결과가 같은지 확인하고 처리량을 잰다.
+# 예) python 벤치마크.py --keywords 100 1000 5000 --paragraphs 2000
+import argparse
+import random
+import time
+
+from 검수엔진 import KeywordMatcher
+
+SYLLABLES = [chr(code) for code in range(0xAC00, 0xD7A4, 37)]  # 한글 음절 일부
+
+def make_keywords(count, rng):
+    """가상의 금지 표현 목록 (일부는 다른 키워드를 포함하도록 만듦, 예: '최고' / '최고의')"""
+    keywords = set()
+    while len(keywords) < count:
+        keyword = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+        keywords.add(keyword)
+        if rng.random() < 0.2 and len(keywords) < count:
+            keywords.add(keyword + rng.choice(SYLLABLES))
+    return sorted(keywords)
+
+def make_manuscript(paragraphs, keywords, rng, length=300, hit_rate=0.01):
+    """가상의 원고 문단 목록 (글자마다 hit_rate 확률로 키워드 삽입)"""
+    result = []
+    for _ in range(paragraphs):
+        parts = []
+        size = 0
+        while size < length:
+            if rng.random() < hit_rate:
+                part = rng.choice(keywords)
+            else:
+                part = rng.choice(SYLLABLES) if rng.random() < 0.85 else ' '
+            parts.append(part)
+            size += len(part)
+        result.append(''.join(parts))
+    return result
+
+def find_with_loop(text, keywords):
+    """기존 방식: 키워드마다 text.find() 반복"""
+    positions = []
+    for keyword in keywords:
+        start = 0
+        while True:
+            index = text.find(keyword, start)
+            if index == -1:
+                break
+            positions.append((index, index + len(keyword), keyword))
+            start = index + 1
+    positions.sort()
+    return positions
+
+def measure(func, paragraphs):
+    started = time.perf_counter()
+    results = [func(text) for text in paragraphs]
+    return results, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description="키워드 검색 성능 비교")
+    parser.add_argument('--keywords', type=int, nargs='+', default=[100, 1000, 5000], help="키워드 수 (여러 개 가능)")
+    parser.add_argument('--paragraphs', type=int, default=1000, help="문단 수")
+    parser.add_argument('--length', type=int, default=300, help="문단 길이 (글자)")
+    parser.add_argument('--seed', type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+
+    print(f"문단 {args.paragraphs}개 x {args.length}자")
+    print(f"{'키워드 수':>8} {'자동기 생성':>10} {'기존 방식':>10} {'자동기':>10} {'배수':>6} {'자동기 처리량':>14} {'찾은 수':>8}")
+    for count in args.keywords:
+        rng = random.Random(args.seed)
+        keywords = make_keywords(count, rng)
+        paragraphs = make_manuscript(args.paragraphs, keywords, rng, args.length)
+        chars = sum(len(text) for text in paragraphs)
+
+        started = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        build_seconds = time.perf_counter() - started
+
+        expected, loop_seconds = measure(lambda text: find_with_loop(text, keywords), paragraphs)
+        found, matcher_seconds = measure(matcher.find_all, paragraphs)
+        if found != expected:
+            raise SystemExit(f"결과 불일치 (키워드 {count}개)")
+
+        print(f"{count:>8} {build_seconds:>9.3f}s {loop_seconds:>9.3f}s {matcher_seconds:>9.3f}s"
+              f" {loop_seconds / matcher_seconds:>5.1f}x {chars / matcher_seconds / 1e6:>10.2f}M자/s"
+              f" {sum(map(len, found)):>8}")
+
+if __name__ == "__main__":
+    main()
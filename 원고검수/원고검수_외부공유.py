@@ -1,61 +1,54 @@
 import streamlit as st
 from docx import Document
-from docx.shared import RGBColor
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import os
 from pathlib import Path
 from datetime import datetime
 import tempfile
+from 검수엔진 import KeywordRepository, get_keyword_matcher, highlight_paragraph, plan_runs, resolve_matches
+
+def authorize_client():
+    """구글 시트 인증, gspread 클라이언트 반환"""
+    scope = ['https://spreadsheets.google.com/feeds',
+            'https://www.googleapis.com/auth/drive']
+    
+    try:
+        # Streamlit Cloud의 secrets에서 인증 정보 가져오기
+        credentials = {
+            "type": st.secrets["gcp_service_account"]["type"],
+            "project_id": st.secrets["gcp_service_account"]["project_id"],
+            "private_key_id": st.secrets["gcp_service_account"]["private_key_id"],
+            "private_key": st.secrets["gcp_service_account"]["private_key"],
+            "client_email": st.secrets["gcp_service_account"]["client_email"],
+            "client_id": st.secrets["gcp_service_account"]["client_id"],
+            "auth_uri": st.secrets["gcp_service_account"]["auth_uri"],
+            "token_uri": st.secrets["gcp_service_account"]["token_uri"],
+            "auth_provider_x509_cert_url": st.secrets["gcp_service_account"]["auth_provider_x509_cert_url"],
+            "client_x509_cert_url": st.secrets["gcp_service_account"]["client_x509_cert_url"]
+        }
+        creds = ServiceAccountCredentials.from_json_keyfile_dict(credentials, scope)
+    except:
+        # 로컬에서 실행할 때는 json 파일 사용
+        creds = ServiceAccountCredentials.from_json_keyfile_name(
+            'D:/이채윤 파일/코딩/colab-408723-89110ae33a5b.json', 
+            scope
+        )
+    
+    return gspread.authorize(creds)
+
+@st.cache_resource
+def get_keyword_repository():
+    """세션 사이에 공유하는 키워드 사본 (keyword_snapshot.json)"""
+    return KeywordRepository(authorize_client)
 
 def get_keywords_from_sheet():
-    """구글 시트에서 키워드와 사유를 가져오는 함수"""
+    """구글 시트에서 키워드와 사유를 가져오는 함수
+
+    로컬 사본이 있으면 바로 돌려주고, 시트가 바뀌었는지는 일정 주기마다 백그라운드에서 확인한다.
+    """
     try:
-        # 구글 시트 인증
-        scope = ['https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive']
-        
-        try:
-            # Streamlit Cloud의 secrets에서 인증 정보 가져오기
-            credentials = {
-                "type": st.secrets["gcp_service_account"]["type"],
-                "project_id": st.secrets["gcp_service_account"]["project_id"],
-                "private_key_id": st.secrets["gcp_service_account"]["private_key_id"],
-                "private_key": st.secrets["gcp_service_account"]["private_key"],
-                "client_email": st.secrets["gcp_service_account"]["client_email"],
-                "client_id": st.secrets["gcp_service_account"]["client_id"],
-                "auth_uri": st.secrets["gcp_service_account"]["auth_uri"],
-                "token_uri": st.secrets["gcp_service_account"]["token_uri"],
-                "auth_provider_x509_cert_url": st.secrets["gcp_service_account"]["auth_provider_x509_cert_url"],
-                "client_x509_cert_url": st.secrets["gcp_service_account"]["client_x509_cert_url"]
-            }
-            creds = ServiceAccountCredentials.from_json_keyfile_dict(credentials, scope)
-        except:
-            # 로컬에서 실행할 때는 json 파일 사용
-            creds = ServiceAccountCredentials.from_json_keyfile_name(
-                'D:/이채윤 파일/코딩/colab-408723-89110ae33a5b.json', 
-                scope
-            )
-        
-        client = gspread.authorize(creds)
-        
-        # 시트 열기
-        sheet = client.open_by_url(
-            'https://docs.google.com/spreadsheets/d/1eNCbstSMyQAA7CPvwb2qE7kZWg40B7Jf-fJ7ti0ABOE/edit?gid=0'
-        ).worksheet('키워드')
-        
-        # 키워드와 사유/제안 가져오기
-        keywords = sheet.col_values(2)[2:]  # B3부터
-        reasons = sheet.col_values(3)[2:]   # C3부터
-        
-        # 딕셔너리로 변환
-        keyword_notes = {}
-        for keyword, reason in zip(keywords, reasons):
-            if keyword.strip():  # 빈 셀 제외
-                keyword_notes[keyword] = reason if reason else ''
-                
-        return keyword_notes
-        
+        return get_keyword_repository().get()
     except Exception as e:
         st.error(f"구글 시트 데이터 가져오기 실패: {str(e)}")
         return None
@@ -117,56 +110,21 @@ def highlight_keywords(content, keyword_notes):
         # docx 파일 처리
         doc = Document(doc_path)
         
+        # 키워드 자동기(오토마톤), 같은 키워드 목록이면 재사용
+        matcher = get_keyword_matcher(keyword_notes)
+        
         # 모든 단락을 순회
         for paragraph in doc.paragraphs:
             # 단락의 텍스트 저장
             text = paragraph.text
             
-            # 키워드 위치 찾기
-            positions = []
-            for keyword in keyword_notes.keys():
-                start = 0
-                while True:
-                    index = text.find(keyword, start)
-                    if index == -1:
-                        break
-                    positions.append((index, index + len(keyword), keyword))
-                    start = index + 1
+            # 키워드 위치 찾기 (모든 키워드를 문단 한 번 순회로)
+            # 겹치는 키워드는 가장 왼쪽, 가장 긴 것 하나만 남김 (예: '최고'와 '최고의' -> '최고의')
+            matches = resolve_matches(matcher.find_all(text))
             
-            if positions:
-                # 위치를 정렬
-                positions.sort()
-                
-                # 기존 runs 제거
-                for run in paragraph.runs:
-                    run._element.getparent().remove(run._element)
-                
-                # 새로운 runs 추가
-                current_pos = 0
-                for start, end, keyword in positions:
-                    # 키워드 전 텍스트
-                    if start > current_pos:
-                        run = paragraph.add_run(text[current_pos:start])
-                        run.font.name = "맑은 고딕"
-                    
-                    # 키워드 (빨간색으로, 굵게)
-                    run = paragraph.add_run(keyword)
-                    run.font.name = "맑은 고딕"
-                    run.font.color.rgb = RGBColor(251, 65, 65)
-                    run.bold = True
-                    
-                    # 노트 추가
-                    if keyword_notes[keyword]:
-                        note_run = paragraph.add_run(f" {keyword_notes[keyword]}")
-                        note_run.font.name = "맑은 고딕"
-                        note_run.font.color.rgb = RGBColor(92, 179, 56)
-                    
-                    current_pos = end
-                
-                # 마지막 키워드 이후 텍스트
-                if current_pos < len(text):
-                    run = paragraph.add_run(text[current_pos:])
-                    run.font.name = "맑은 고딕"
+            if matches:
+                # 키워드가 걸친 런만 나누어 강조 (나머지 런의 굵게/링크/글꼴은 그대로)
+                highlight_paragraph(paragraph, plan_runs(text, matches, keyword_notes))
         
         # 결과 파일 저장
         result_path = os.path.join(tempfile.gettempdir(), "검수결과.docx")
@@ -1,11 +1,14 @@
 try:
     from docx import Document
-    from docx.shared import RGBColor
     import gspread
     from oauth2client.service_account import ServiceAccountCredentials
     import os
     from pathlib import Path
     from datetime import datetime
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    import sys
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / '원고검수'))  # 검수엔진은 원고검수 폴더의 것을 함께 씀
+    from 검수엔진 import KeywordRepository, get_keyword_matcher, highlight_paragraph, plan_runs, resolve_matches
     import win32com.client as win32
     import winreg
 except ImportError as e:
@@ -110,7 +113,7 @@ def highlight_keywords(doc_path, keyword_notes, output_path):
         # 파일 존재 확인
         if not os.path.exists(doc_path):
             print(f"Error: 파일을 찾을 수 없습니다 - {doc_path}")
-            return
+            return False
             
         # 파일 확장자 확인
         file_ext = os.path.splitext(doc_path)[1].lower()
@@ -122,56 +125,26 @@ def highlight_keywords(doc_path, keyword_notes, output_path):
             # docx 파일 처리
             doc = Document(doc_path)
             
+            # 키워드 자동기(오토마톤), 같은 키워드 목록이면 재사용
+            matcher = get_keyword_matcher(keyword_notes)
+            
             # 모든 단락을 순회
             for paragraph in doc.paragraphs:
                 # 단락의 텍스트 저장
                 text = paragraph.text
                 
-                # 키워드 위치 찾기
-                positions = []
-                for keyword in keyword_notes.keys():
-                    start = 0
-                    while True:
-                        index = text.find(keyword, start)
-                        if index == -1:
-                            break
-                        positions.append((index, index + len(keyword), keyword))
-                        start = index + 1
+                # 키워드 위치 찾기 (모든 키워드를 문단 한 번 순회로)
+                # 겹치는 키워드는 가장 왼쪽, 가장 긴 것 하나만 남김 (예: '최고'와 '최고의' -> '최고의')
+                matches = resolve_matches(matcher.find_all(text))
                 
-                if positions:
-                    # 위치를 정렬
-                    positions.sort()
-                    
-                    # 기존 runs 제거
-                    for run in paragraph.runs:
-                        run._element.getparent().remove(run._element)
-                    
-                    # 새로운 runs 추가
-                    current_pos = 0
-                    for start, end, keyword in positions:
-                        # 키워드 전 텍스트
-                        if start > current_pos:
-                            run = paragraph.add_run(text[current_pos:start])
-                        
-                        # 키워드 (빨간색으로, 굵게)
-                        run = paragraph.add_run(keyword)
-                        run.font.color.rgb = RGBColor(251, 65, 65)
-                        run.bold = True  # 굵게 표시
-                        
-                        # 키워드 옆에 노트 추가
-                        if keyword_notes[keyword]:  # 노트가 있는 경우에만
-                            note_run = paragraph.add_run(f" {keyword_notes[keyword]}")
-                            note_run.font.color.rgb = RGBColor(92, 179, 56)
-                        
-                        current_pos = end
-                    
-                    # 마지��� 키워드 이후 텍스트
-                    if current_pos < len(text):
-                        run = paragraph.add_run(text[current_pos:])
+                if matches:
+                    # 키워드가 걸친 런만 나누어 강조 (나머지 런의 굵게/링크/글꼴은 그대로)
+                    highlight_paragraph(paragraph, plan_runs(text, matches, keyword_notes))
             
             # 수정된 문서 저장
             doc.save(output_path)
             print("Word 문서 처리가 완료되었습니다.")
+            return True
         elif file_ext == '.txt':
             print("txt 파일을 docx로 변환 중...")
             docx_path = convert_txt_to_docx(doc_path)
@@ -196,36 +169,25 @@ def highlight_keywords(doc_path, keyword_notes, output_path):
             
     except Exception as e:
         print(f"오류 발생: {str(e)}")
+        return False
+
+def authorize_client():
+    """구글 시트 인증, gspread 클라이언트 반환"""
+    scope = ['https://spreadsheets.google.com/feeds',
+            'https://www.googleapis.com/auth/drive']
+    creds = ServiceAccountCredentials.from_json_keyfile_name(
+        'D:/이채윤 파일/코딩/colab-408723-89110ae33a5b.json', 
+        scope
+    )
+    return gspread.authorize(creds)
 
 def get_keywords_from_sheet():
-    """구글 시트에서 키워드와 사유를 가져오는 함수"""
+    """구글 시트에서 키워드와 사유를 가져오는 함수
+
+    시트가 바뀐 경우에만 키워드를 다시 읽고, 시트에 접속할 수 없으면 마지막 로컬 사본을 쓴다.
+    """
     try:
-        # 구글 시트 인증
-        scope = ['https://spreadsheets.google.com/feeds',
-                'https://www.googleapis.com/auth/drive']
-        creds = ServiceAccountCredentials.from_json_keyfile_name(
-            'D:/이채윤 파일/코딩/colab-408723-89110ae33a5b.json', 
-            scope
-        )
-        client = gspread.authorize(creds)
-        
-        # 시트 열기
-        sheet = client.open_by_url(
-            'https://docs.google.com/spreadsheets/d/1eNCbstSMyQAA7CPvwb2qE7kZWg40B7Jf-fJ7ti0ABOE/edit?gid=0'
-        ).worksheet('키워드')
-        
-        # 키워드와 사유/제안 가져오기
-        keywords = sheet.col_values(2)[2:]  # B3부터
-        reasons = sheet.col_values(3)[2:]   # C3부터
-        
-        # 딕셔너리로 변환
-        keyword_notes = {}
-        for keyword, reason in zip(keywords, reasons):
-            if keyword.strip():  # 빈 셀 제외
-                keyword_notes[keyword] = reason if reason else ''
-                
-        return keyword_notes
-        
+        return KeywordRepository(authorize_client).get(wait=True)
     except Exception as e:
         print(f"구글 시트 데이터 가져오기 실패: {str(e)}")
         return None
@@ -244,6 +206,59 @@ def find_file_with_extension(base_path):
     # 파일을 찾지 못한 경우
     return None, None
 
+# 작업 프로세스마다 한 번 받아 두는 키워드 (문서마다 다시 넘기지 않음)
+_worker_keyword_notes = None
+
+def init_review_worker(keyword_notes):
+    """작업 프로세스 초기화: 키워드를 받아 두고 키워드 자동기(오토마톤)를 미리 만듦"""
+    global _worker_keyword_notes
+    _worker_keyword_notes = keyword_notes
+    get_keyword_matcher(keyword_notes)
+
+def review_file(job):
+    """작업 프로세스에서 파일 하나 검수, (행 번호, 완료 시각 또는 None) 반환"""
+    row, input_file, output_file = job
+    if highlight_keywords(input_file, _worker_keyword_notes, output_file) is not True:
+        return row, None
+    return row, datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def review_files(jobs, keyword_notes, workers=None):
+    """(행 번호, 입력 파일, 출력 파일) 목록을 프로세스 풀에서 병렬로 검수, {행 번호: 완료 시각} 반환
+
+    workers를 지정하지 않으면 CPU 코어 수만큼 작업 프로세스를 띄운다.
+    """
+    # fork를 쓰는 환경에서는 부모에서 만든 자동기를 작업 프로세스가 그대로 물려받음
+    get_keyword_matcher(keyword_notes)
+    finished = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_review_worker,
+                             initargs=(keyword_notes,)) as executor:
+        futures = {executor.submit(review_file, job): job for job in jobs}
+        for future in as_completed(futures):
+            row, input_file, _ = futures[future]
+            try:
+                _, finished_at = future.result()
+            except Exception as e:
+                print(f"오류 발생: {os.path.basename(input_file)} - {str(e)}")
+                continue
+            if finished_at:
+                finished[row] = finished_at
+                print(f"완료: {os.path.basename(input_file)}")
+            else:
+                print(f"실패: {os.path.basename(input_file)}")
+    return finished
+
+def write_finished_times(spreadsheet, finished):
+    """완료 시각을 검수파일 시트 I열에 한 번에 기록 (values().batchUpdate 한 번 호출)"""
+    if not finished:
+        return
+    spreadsheet.values_batch_update({
+        'valueInputOption': 'USER_ENTERED',
+        'data': [
+            {'range': f"검수파일!I{row}", 'values': [[finished_at]]}
+            for row, finished_at in sorted(finished.items())
+        ],
+    })
+
 if __name__ == "__main__":
     try:
         # 구글 시트에서 키워드와 사유 가져오기
@@ -253,45 +268,39 @@ if __name__ == "__main__":
             exit(1)
             
         # 구글 시트 연결
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_name(
-            'D:/이채윤 파일/코딩/colab-408723-89110ae33a5b.json', 
-            scope
-        )
-        client = gspread.authorize(creds)
+        client = authorize_client()
         
         # 검수파일 시트 열기
-        sheet = client.open_by_url(
+        spreadsheet = client.open_by_url(
             'https://docs.google.com/spreadsheets/d/1eNCbstSMyQAA7CPvwb2qE7kZWg40B7Jf-fJ7ti0ABOE/edit?gid=226778372'
-        ).worksheet('검수파일')
+        )
+        sheet = spreadsheet.worksheet('검수파일')
         
-        # 파일 정보 가져오기
-        file_paths = sheet.range('F4:F100')  # 충분히 큰 범위 지정
-        file_names = sheet.range('G4:G100')
-        output_paths = sheet.range('H4:H100')
+        # 파일 정보 가져오기 (F: 경로, G: 파일명, H: 출력 파일명, 4행부터 한 번에)
+        rows = sheet.get('F4:H')
         
-        # 각 파일 처리
-        for i, (path_cell, name_cell, output_cell) in enumerate(zip(file_paths, file_names, output_paths)):
-            if path_cell.value and name_cell.value:  # 값이 있는 행만 처리
-                base_path = f"{path_cell.value}\{name_cell.value}"
+        # 검수할 파일 목록
+        jobs = []
+        for i, row in enumerate(rows):
+            path, name, output = (list(row) + ['', '', ''])[:3]
+            if path and name:  # 값이 있는 행만 처리
+                base_path = f"{path}\{name}"
                 input_file, ext = find_file_with_extension(base_path)
                 
                 if input_file and os.path.exists(input_file):
                     # 출력 파일에도 같은 확장자 사용
-                    output_file = f"{path_cell.value}\{output_cell.value}{ext}"
-                    
-                    print(f"\n처리 중: {name_cell.value}{ext}")
-                    highlight_keywords(input_file, keyword_notes, output_file)
-                    
-                    # 업데이트 일자 기록
-                    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    sheet.update_cell(i + 4, 9, now)  # I열��� 업데이트 일자 기록
-                    print(f"완료: {name_cell.value}{ext}")
+                    output_file = f"{path}\{output}{ext}"
+                    jobs.append((i + 4, input_file, output_file))
                 else:
                     print(f"\n파일을 찾을 수 없음: {base_path}")
                     print("지원하는 확장자: .txt, .docx")
-            elif not path_cell.value:  # 빈 행을 만나면 종료
+            elif not path:  # 빈 행을 만나면 종료
                 break
+        
+        # 여러 파일을 동시에 처리한 뒤 업데이트 일자는 I열에 한 번에 기록
+        print(f"\n검수할 파일 {len(jobs)}개")
+        finished = review_files(jobs, keyword_notes)
+        write_finished_times(spreadsheet, finished)
                 
         print("\n모든 파일 처리 완료")
         